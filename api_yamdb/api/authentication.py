@@ -0,0 +1,112 @@
+"""Модуль аутентификации по JWT без обращения к базе на каждый запрос"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser as BaseTokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from reviews.models import User
+
+USER_KEY = 'user:{pk}'
+TOKEN_VERSION_KEY = 'token-version:{pk}'
+TOKEN_VERSION_CLAIM = 'ver'
+USER_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+# поля, изменение которых отзывает выданные токены
+TOKEN_FIELDS = (*USER_CLAIMS, 'is_active')
+
+
+def get_access_token(user):
+    """Access-токен с ролью и флагами, достаточными для проверки прав"""
+    token = RefreshToken.for_user(user).access_token
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    return token
+
+
+def get_cached_user(pk):
+    """Полный пользователь из кратковременного кэша"""
+    key = USER_KEY.format(pk=pk)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=pk).first()
+        cache.set(key, user, settings.REVIEW['USER_CACHE_TIMEOUT'])
+    return user
+
+
+def get_token_version(pk):
+    key = TOKEN_VERSION_KEY.format(pk=pk)
+    version = cache.get(key)
+    if version is None:
+        version = (
+            User.objects.filter(pk=pk)
+            .values_list('token_version', flat=True).first()
+        )
+        cache.set(key, version, settings.REVIEW['TOKEN_VERSION_TIMEOUT'])
+    return version
+
+
+def forget_users(pks):
+    """Сброс кэша пользователей сразу и после фиксации транзакции"""
+    keys = [
+        key.format(pk=pk) for pk in pks
+        for key in (USER_KEY, TOKEN_VERSION_KEY)
+    ]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class TokenUser(BaseTokenUser):
+    """
+    Пользователь из утверждений access-токена: id, имя, роль и флаги.
+    Модели за ним нет, для связей используется user_reference.
+    """
+    is_admin = User.is_admin
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @cached_property
+    def token_version(self):
+        return self.token[TOKEN_VERSION_CLAIM]
+
+
+def user_reference(user):
+    """
+    Пользователь для связей моделей. Пользователь из токена заменяется
+    экземпляром модели с полями из утверждений — без запроса к базе.
+    """
+    if not isinstance(user, TokenUser):
+        return user
+    reference = User(
+        pk=user.pk, token_version=user.token_version,
+        **{claim: getattr(user, claim) for claim in USER_CLAIMS}
+    )
+    reference._state.adding = False
+    return reference
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Пользователь восстанавливается из утверждений токена.
+    Отзыв токенов проверяется по версии в кэше: смена роли или
+    флагов пользователя увеличивает версию. Токены без утверждений
+    о роли или без версии не принимаются — их нельзя отозвать.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            pk = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Токен не содержит идентификатор пользователя')
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            raise InvalidToken('Токен не содержит утверждений о роли')
+        version = validated_token.get(TOKEN_VERSION_CLAIM)
+        if version is None or version != get_token_version(pk):
+            raise AuthenticationFailed('Токен отозван', code='token_revoked')
+        return TokenUser(validated_token)
@@ -0,0 +1,113 @@
+"""Модуль подсказок по началу названий"""
+import re
+from bisect import bisect_left, insort
+
+from reviews.models import Category, Genre, Title
+
+from .cache import AUTOCOMPLETE
+from .search import MemoryIndex, normalize
+
+WORD = re.compile(r'\w+')
+
+SOURCES = {
+    'titles': Title,
+    'genres': Genre,
+    'categories': Category,
+}
+KINDS = {model: kind for kind, model in SOURCES.items()}
+
+
+def word_suffixes(name):
+    """Ключи с начала каждого слова названия"""
+    return {name[match.start():] for match in WORD.finditer(name)}
+
+
+def make_item(kind, pk, name, slug=None):
+    if kind == 'titles':
+        return {'id': pk, 'name': name}
+    return {'name': name, 'slug': slug}
+
+
+class PrefixList:
+    """
+    Отсортированный массив пар (ключ, id): совпадения с префиксом
+    идут подряд и находятся через bisect.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.items = {}
+
+    def add(self, pk, name, item):
+        self.discard(pk)
+        keys = word_suffixes(normalize(name))
+        self.items[pk] = keys, item
+        for key in keys:
+            insort(self.keys, (key, pk))
+
+    def load(self, rows):
+        """Заполнение пустого списка с одной сортировкой"""
+        for pk, name, item in rows:
+            keys = word_suffixes(normalize(name))
+            self.items[pk] = keys, item
+            self.keys.extend((key, pk) for key in keys)
+        self.keys.sort()
+
+    def discard(self, pk):
+        keys, _ = self.items.pop(pk, (None, None))
+        for key in keys or ():
+            del self.keys[bisect_left(self.keys, (key, pk))]
+
+    def search(self, prefix, limit):
+        found = {}
+        position = bisect_left(self.keys, (prefix,))
+        while position < len(self.keys) and len(found) < limit:
+            key, pk = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(pk, self.items[pk][1])
+            position += 1
+        return list(found.values())
+
+
+class Autocomplete(MemoryIndex):
+    """
+    Подсказки по произведениям, жанрам и категориям.
+    Изменения — кортежи (вид, id, название, slug), None вместо
+    названия означает удаление.
+    """
+    namespace = AUTOCOMPLETE
+
+    def clear(self):
+        self.lists = {kind: PrefixList() for kind in SOURCES}
+
+    def load(self):
+        for kind, model in SOURCES.items():
+            fields = ('pk', 'name') if kind == 'titles' else (
+                'pk', 'name', 'slug'
+            )
+            self.lists[kind].load(
+                (pk, name, make_item(kind, pk, name, *slug))
+                for pk, name, *slug in model.objects.values_list(
+                    *fields
+                ).iterator()
+            )
+
+    def apply(self, change):
+        kind, pk, name, slug = change
+        if name is None:
+            self.lists[kind].discard(pk)
+        else:
+            self.lists[kind].add(pk, name, make_item(kind, pk, name, slug))
+
+    def search(self, query, limit):
+        prefix = normalize(query)
+        with self.lock:
+            self.sync()
+            return {
+                kind: prefixes.search(prefix, limit)
+                for kind, prefixes in self.lists.items()
+            }
+
+
+prefix_index = Autocomplete()
@@ -0,0 +1,151 @@
+"""Модуль нагрузочного тестирования API"""
+import math
+import random
+import time
+from collections import OrderedDict
+
+from django.db import connection
+from django.test import Client
+from reviews.models import Genre, Review, Title, User
+
+from .authentication import get_access_token
+from .metrics import RequestStats
+
+SCENARIOS = (
+    'title_list', 'title_detail', 'review_list', 'comment_list',
+    'signup', 'token', 'review_post',
+)
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+
+class Benchmark:
+    """
+    Прогон сценариев через тестовый клиент Django.
+    Для каждого сценария считаются запросы в секунду, задержка
+    p50/p99 и среднее число запросов к базе.
+    """
+
+    def __init__(self, requests=100, seed=0):
+        self.requests = requests
+        self.random = random.Random(seed)
+        self.client = Client()
+        self.titles = list(Title.objects.values_list('pk', flat=True))
+        self.reviews = list(Review.objects.values_list('pk', 'title_id'))
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.years = list(
+            Title.objects.order_by().values_list('year', flat=True)
+            .distinct()
+        )
+        self.signed_up = []
+        if not self.titles or not self.reviews:
+            raise ValueError('Для прогона нужны произведения и отзывы')
+
+    def title_list(self, number):
+        params = {}
+        if self.genres:
+            params['genre'] = self.random.choice(self.genres)
+        if self.random.random() < 0.5:
+            params['year'] = self.random.choice(self.years)
+        return 'get', '/api/v1/titles/', params, {}
+
+    def title_detail(self, number):
+        pk = self.random.choice(self.titles)
+        return 'get', f'/api/v1/titles/{pk}/', None, {}
+
+    def review_list(self, number):
+        pk = self.random.choice(self.titles)
+        return 'get', f'/api/v1/titles/{pk}/reviews/', None, {}
+
+    def comment_list(self, number):
+        pk, title_id = self.random.choice(self.reviews)
+        return (
+            'get', f'/api/v1/titles/{title_id}/reviews/{pk}/comments/',
+            None, {}
+        )
+
+    def signup(self, number):
+        username = f'bench{number}'
+        self.signed_up.append(username)
+        return 'post', '/api/v1/auth/signup/', {
+            'username': username, 'email': f'{username}@yamdb.fake'
+        }, {}
+
+    def token(self, number):
+        if number >= len(self.signed_up):
+            # без сценария signup пользователи регистрируются вне замера
+            _, path, data, _ = self.signup(len(self.signed_up))
+            self.client.post(path, data)
+        username = self.signed_up[number]
+        code = User.objects.values_list('code', flat=True).get(
+            username=username
+        )
+        return 'post', '/api/v1/auth/token/', {
+            'username': username, 'confirmation_code': code
+        }, {}
+
+    def review_post(self, number):
+        author_number, title_number = divmod(number, len(self.titles))
+        author, _ = User.objects.get_or_create(
+            username=f'critic{author_number}',
+            defaults={'email': f'critic{author_number}@yamdb.fake'}
+        )
+        return (
+            'post', f'/api/v1/titles/{self.titles[title_number]}/reviews/',
+            {'text': 'Отзыв', 'score': self.random.randint(1, 10)},
+            {'HTTP_AUTHORIZATION': f'Bearer {get_access_token(author)}'}
+        )
+
+    def run_scenario(self, name):
+        make_request = getattr(self, name)
+        latencies = []
+        queries = 0
+        for number in range(self.requests):
+            method, path, data, headers = make_request(number)
+            stats = RequestStats()
+            with connection.execute_wrapper(stats):
+                started = time.perf_counter()
+                response = getattr(self.client, method)(path, data, **headers)
+                latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f'{name}: {method.upper()} {path} — '
+                    f'статус {response.status_code}'
+                )
+            queries += stats.queries
+        return OrderedDict((
+            ('rps', round(len(latencies) / sum(latencies), 1)),
+            ('p50', round(percentile(latencies, 0.5) * 1000, 2)),
+            ('p99', round(percentile(latencies, 0.99) * 1000, 2)),
+            ('queries', round(queries / len(latencies), 2)),
+        ))
+
+    def run(self, scenarios=SCENARIOS):
+        return OrderedDict(
+            (name, self.run_scenario(name)) for name in scenarios
+        )
+
+
+def compare(results, baseline, tolerance):
+    """
+    Отклонения от базовых результатов: медиана задержки хуже более
+    чем на tolerance или выросло число запросов к базе.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['p50'] > base['p50'] * (1 + tolerance):
+            regressions.append(
+                f'{name}: p50 {result["p50"]} мс при базовых {base["p50"]} мс'
+            )
+        if result['queries'] > base['queries']:
+            regressions.append(
+                f'{name}: {result["queries"]} запросов к базе '
+                f'при базовых {base["queries"]}'
+            )
+    return regressions
@@ -0,0 +1,140 @@
+"""Модуль пакетной записи в базу данных"""
+import io
+
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+
+# маркер NULL для COPY; значение "\N" в кавычках остается строкой
+COPY_NULL = r'\N'
+
+
+def copy_line(values):
+    """
+    Строка CSV для COPY. None пишется маркером COPY_NULL без кавычек,
+    остальные значения — в кавычках, так что пустая строка остается
+    пустой строкой, а не NULL.
+    """
+    return ','.join(
+        COPY_NULL if value is None
+        else '"{}"'.format(str(value).replace('"', '""'))
+        for value in values
+    ) + '\n'
+
+
+class BulkWriter:
+    """
+    Буферизованная вставка объектов модели пачками.
+    На PostgreSQL пачка уходит одним COPY, на остальных СУБД —
+    подготовленным INSERT через executemany. Сигналы и save()
+    моделей не вызываются, id вставленных объектов не возвращаются,
+    явно заданные даты auto_now_add сохраняются.
+    """
+
+    def __init__(self, model, batch_size=5000, use_copy=True):
+        self.model = model
+        self.batch_size = batch_size
+        self.using = router.db_for_write(model)
+        self.connection = connections[self.using]
+        self.use_copy = use_copy and self.connection.vendor == 'postgresql'
+        self.buffer = []
+        self.written = 0
+        self.explicit_pk = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def write(self, instance):
+        self.buffer.append(instance)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.explicit_pk |= self.buffer[0].pk is not None
+        if self.use_copy:
+            self.copy(self.buffer)
+        else:
+            self.insert(self.buffer)
+        self.written += len(self.buffer)
+        self.buffer = []
+
+    def fields(self):
+        return [
+            field for field in self.model._meta.concrete_fields
+            if self.explicit_pk or not field.primary_key
+        ]
+
+    def value(self, field, instance):
+        """
+        Значение колонки. Явная дата auto_now_add берется как есть,
+        пустая заполняется текущим временем в pre_save.
+        """
+        value = getattr(instance, field.attname)
+        if not getattr(field, 'auto_now_add', False) or value is None:
+            value = field.pre_save(instance, add=True)
+        return field.get_db_prep_save(value, self.connection)
+
+    def rows(self, fields, instances):
+        for instance in instances:
+            yield [self.value(field, instance) for field in fields]
+
+    def copy(self, instances):
+        fields = self.fields()
+        data = io.StringIO(''.join(
+            copy_line(row) for row in self.rows(fields, instances)
+        ))
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(self.model._meta.db_table)} ({columns}) '
+                f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                data
+            )
+
+    def insert(self, instances):
+        fields = self.fields()
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        with transaction.atomic(
+            using=self.using, savepoint=False
+        ), self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {quote(self.model._meta.db_table)} '
+                f'({columns}) VALUES ({placeholders})',
+                list(self.rows(fields, instances))
+            )
+
+    def close(self):
+        """Запись остатка и сдвиг последовательности после явных id"""
+        self.flush()
+        if self.explicit_pk:
+            reset_sequences(self.model, using=self.using)
+
+
+def reset_sequences(*models, using='default'):
+    """Сдвиг последовательностей id за максимальный записанный"""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def resolve_columns(model, headers):
+    """Имена атрибутов модели для заголовков CSV (поле или поле_id)"""
+    fields = {}
+    for field in model._meta.concrete_fields:
+        fields[field.name] = fields[field.attname] = field.attname
+    try:
+        return [fields[header] for header in headers]
+    except KeyError as error:
+        raise ValueError(
+            f'{model._meta.label}: неизвестная колонка {error}'
+        ) from None
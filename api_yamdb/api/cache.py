@@ -0,0 +1,249 @@
+"""Модуль версионного кэширования"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.validators import slug_re
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from reviews.models import Title
+
+from .serializers import ReadTitleSerializer
+
+VERSION_KEY = 'version:{namespace}'
+CHANGES_KEY = 'changes:{namespace}:{version}'
+STAMP_KEY = 'stamp:{name}'
+TITLE_CARDS = 'title-cards'
+RANKING = 'ranking'
+TITLE_SEARCH = 'title-search'
+AUTOCOMPLETE = 'autocomplete'
+
+
+def get_version(namespace):
+    """Текущая версия пространства имен кэша"""
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    """
+    Смена версии делает недоступными все ключи пространства имен.
+    Потерянная версия заменяется меткой времени, которая больше
+    любой выданной ранее, поэтому старые записи не оживают.
+    """
+    key = VERSION_KEY.format(namespace=namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def publish_changes(namespace, changes):
+    """
+    Новая версия пространства имен и изменения, сохраненные под ней:
+    по ним процессы догоняют свои индексы в памяти без перестроения.
+    None, если версия была потеряна и заменена меткой времени.
+    """
+    key = VERSION_KEY.format(namespace=namespace)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+        return None
+    cache.set(
+        CHANGES_KEY.format(namespace=namespace, version=version), changes,
+        settings.REVIEW['INDEX_CHANGES_TIMEOUT']
+    )
+    return version
+
+
+def get_changes(namespace, first, last):
+    """
+    Изменения версий first..last по порядку или None, если часть
+    из них потеряна или сменилась без журнала (invalidate).
+    """
+    keys = [
+        CHANGES_KEY.format(namespace=namespace, version=version)
+        for version in range(first, last + 1)
+    ]
+    found = cache.get_many(keys)
+    if len(found) != len(keys):
+        return None
+    return [change for key in keys for change in found[key]]
+
+
+def invalidate(namespace):
+    """
+    Сброс версии сразу и после фиксации транзакции: так в кэш
+    не попадут данные, прочитанные до коммита.
+    """
+    bump_version(namespace)
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def versioned_key(namespace, *parts):
+    return ':'.join(map(str, (namespace, get_version(namespace), *parts)))
+
+
+def title_card_key(pk):
+    return versioned_key(TITLE_CARDS, pk)
+
+
+def get_title_cards(ids, row_serializer=None):
+    """
+    Карточки произведений в порядке ids.
+    Закэшированные берутся одним get_many, остальные сериализуются
+    за два запроса и сохраняются одним set_many. С row_serializer
+    карточки строятся из кортежей без моделей.
+    """
+    keys = {pk: title_card_key(pk) for pk in ids}
+    cached = cache.get_many(keys.values())
+    cards = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [pk for pk in ids if pk not in cards]
+    if missing:
+        if row_serializer is not None:
+            fresh = row_serializer.cards(missing)
+        else:
+            fresh = ReadTitleSerializer(
+                Title.objects.filter(pk__in=missing)
+                .select_related('category').prefetch_related('genre'),
+                many=True
+            ).data
+        fresh = {card['id']: card for card in fresh}
+        cache.set_many(
+            {keys[pk]: card for pk, card in fresh.items()},
+            settings.REVIEW['CATALOG_CACHE_TIMEOUT']
+        )
+        cards.update(fresh)
+    return [cards[pk] for pk in ids if pk in cards]
+
+
+def invalidate_title_cards(ids):
+    """Удаление карточек сразу и после фиксации транзакции"""
+    ids = list(ids)
+    if not ids:
+        return
+
+    def delete():
+        cache.delete_many([title_card_key(pk) for pk in ids])
+
+    delete()
+    transaction.on_commit(delete)
+
+
+def rank_key(rating, rating_count, pk):
+    """Ключ сортировки рейтинга: по убыванию оценки и числа отзывов"""
+    return -rating, -rating_count, pk
+
+
+def get_ranking(genre=None, category=None):
+    """
+    id произведений с наибольшим рейтингом, в том числе в пределах
+    жанра и категории. Список выбирается по индексу рейтинга,
+    жанр проверяется по уникальному индексу связей на каждое
+    произведение. В кэше хранятся ключи сортировки, по которым
+    rerank_title решает, затрагивает ли список новая оценка.
+    """
+    if not all(map(slug_re.match, filter(None, (genre, category)))):
+        return []
+    key = versioned_key(RANKING, genre or '', category or '')
+    ranking = cache.get(key)
+    if ranking is None:
+        titles = Title.objects.filter(rating__isnull=False)
+        if genre:
+            titles = titles.annotate(in_genre=Exists(
+                Title.genre.through.objects.filter(
+                    title_id=OuterRef('pk'), genre__slug=genre
+                )
+            )).filter(in_genre=True)
+        if category:
+            titles = titles.filter(category__slug=category)
+        ranking = [
+            rank_key(*row) for row in
+            titles.order_by('-rating', '-rating_count', 'id')
+            .values_list('rating', 'rating_count', 'pk')
+            [:settings.REVIEW['TOP_MAX_SIZE']]
+        ]
+        if ranking:
+            cache.set(
+                key, ranking, settings.REVIEW['CATALOG_CACHE_TIMEOUT']
+            )
+    return [pk for *_, pk in ranking]
+
+
+def rerank_title(title_id):
+    """
+    Сброс только тех списков лучших произведений, в которых
+    произведение уже есть или куда оно может войти с новой оценкой.
+    Проверяются списки без фильтров, его категории, жанров
+    и их сочетаний — другие списки произведение не затрагивает.
+    """
+    def rerank():
+        rows = list(Title.objects.filter(pk=title_id).values_list(
+            'rating', 'rating_count', 'category__slug', 'genre__slug'
+        ))
+        if not rows:
+            return
+        rating, rating_count, category, _ = rows[0]
+        genres = {'', *(genre for *_, genre in rows if genre)}
+        categories = {'', category} if category else {''}
+        keys = [
+            versioned_key(RANKING, genre, category)
+            for genre in genres for category in categories
+        ]
+        rank = None
+        if rating is not None:
+            rank = rank_key(rating, rating_count, title_id)
+        size = settings.REVIEW['TOP_MAX_SIZE']
+
+        def affected(ranking):
+            if any(pk == title_id for *_, pk in ranking):
+                return True
+            return rank is not None and (
+                len(ranking) < size or rank < tuple(ranking[-1])
+            )
+
+        cache.delete_many([
+            key for key, ranking in cache.get_many(keys).items()
+            if affected(ranking)
+        ])
+
+    rerank()
+    transaction.on_commit(rerank)
+
+
+def invalidate_ranking(ids):
+    """Сброс рейтингов при смене жанров или категории оцененных"""
+    if Title.objects.filter(pk__in=ids, rating__isnull=False).exists():
+        invalidate(RANKING)
+
+
+def touch(*names):
+    """Обновление меток изменения сразу и после фиксации транзакции"""
+    def update():
+        now = time.time()
+        cache.set_many(
+            {STAMP_KEY.format(name=name): now for name in names},
+            timeout=None
+        )
+
+    update()
+    transaction.on_commit(update)
+
+
+def get_stamp(*names):
+    """
+    Время последнего изменения для группы меток.
+    Потерянная метка считается обновленной сейчас.
+    """
+    keys = [STAMP_KEY.format(name=name) for name in names]
+    stamps = cache.get_many(keys)
+    now = time.time()
+    for key in set(keys) - set(stamps):
+        cache.add(key, now, timeout=None)
+        stamps[key] = cache.get(key, now)
+    return max(stamps.values())
@@ -0,0 +1,58 @@
+"""Модуль условных GET-запросов"""
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response, quote_etag
+
+from .cache import get_stamp
+
+
+class NotModifiedError(Exception):
+    """Прерывание обработки готовым ответом 304"""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ETag по меткам изменения из кэша, If-None-Match проверяется
+    до запросов к базе и сериализации. Last-Modified не отдается:
+    его точность — секунда, и изменение в ту же секунду давало бы 304
+    с устаревшими данными.
+    """
+    conditional_actions = ('list', 'retrieve')
+    conditional_validators = None
+
+    def get_stamp_names(self):
+        raise NotImplementedError
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method not in ('GET', 'HEAD')
+            or self.action not in self.conditional_actions
+        ):
+            return
+        stamp = get_stamp(*self.get_stamp_names())
+        etag = quote_etag(md5('|'.join((
+            repr(stamp), request.get_full_path(),
+            request.accepted_media_type
+        )).encode()).hexdigest())
+        self.conditional_validators = etag
+        response = get_conditional_response(request._request, etag=etag)
+        if response is not None:
+            raise NotModifiedError(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModifiedError):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self.conditional_validators and response.status_code in (200, 304):
+            response['ETag'] = self.conditional_validators
+        return response
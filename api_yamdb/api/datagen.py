@@ -0,0 +1,293 @@
+"""Модуль генерации синтетических данных"""
+import multiprocessing
+import random
+from collections import Counter
+from datetime import timedelta
+from functools import lru_cache
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+from django.db.models import Max
+from django.utils import timezone
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+from .bulk import BulkWriter, reset_sequences
+from .cache import (AUTOCOMPLETE, RANKING, TITLE_CARDS, TITLE_SEARCH,
+                    invalidate, touch)
+from .facets import rebuild_facets
+from .services import rebuild_ratings
+
+DEFAULT_COUNTS = {
+    'users': 100,
+    'categories': 10,
+    'genres': 20,
+    'titles': 1000,
+    'reviews': 5000,
+    'comments': 10000,
+}
+DEFAULT_ZIPF = 1.1
+MAX_GENRES_PER_TITLE = 3
+CHUNK_REVIEWS = 50000
+DRAW_BATCH = 1000000
+DATE_SPREAD = timedelta(days=5 * 365)
+
+
+def first_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class ZipfSampler:
+    """
+    Выбор с вероятностью, обратной степени ранга элемента.
+    Ранги раздаются после перемешивания, поэтому популярные
+    объекты разбросаны по всему диапазону id.
+    """
+
+    def __init__(self, items, exponent, seed):
+        self.items = list(items)
+        random.Random(seed).shuffle(self.items)
+        self.cum_weights = list(accumulate(
+            rank ** -exponent for rank in range(1, len(self.items) + 1)
+        ))
+
+    def __len__(self):
+        return len(self.items)
+
+    def sample(self, rng, k=1):
+        if not k:
+            return []
+        return rng.choices(self.items, cum_weights=self.cum_weights, k=k)
+
+    def distinct(self, rng, k):
+        """
+        k разных элементов. Когда выбор по весам упирается в хвост
+        распределения, остаток добирается равномерно.
+        """
+        chosen = dict.fromkeys(self.sample(rng, min(k, len(self)) * 2))
+        chosen = list(chosen)[:k]
+        picked = set(chosen)
+        if len(chosen) < k and k * 2 > len(self):
+            rest = [item for item in self.items if item not in picked]
+            return chosen + rng.sample(rest, k - len(chosen))
+        while len(chosen) < k:
+            item = rng.choice(self.items)
+            if item not in picked:
+                picked.add(item)
+                chosen.append(item)
+        return chosen
+
+
+@lru_cache(maxsize=4)
+def user_sampler(first, count, exponent, seed):
+    """Выборка пользователей; в каждом процессе строится один раз"""
+    return ZipfSampler(range(first, first + count), exponent, seed)
+
+
+def write_chunk(task):
+    """
+    Отзывы и комментарии одной пачки произведений.
+    Генератор случайных чисел зависит только от seed и номера пачки,
+    поэтому результат не зависит от числа процессов.
+    """
+    rng = random.Random(task['seed'] * 1000003 + task['chunk'])
+    users = user_sampler(*task['users'], task['zipf'], task['seed'])
+    now, batch_size, use_copy = task['now'], task['batch'], task['copy']
+    review_pk = task['review_start']
+    with BulkWriter(Review, batch_size, use_copy) as writer:
+        for title_id, count in task['titles']:
+            for author_id in users.distinct(rng, count):
+                writer.write(Review(
+                    pk=review_pk, title_id=title_id, author_id=author_id,
+                    text=f'Отзыв {review_pk}', score=rng.randint(1, 10),
+                    pub_date=now - DATE_SPREAD * rng.random()
+                ))
+                review_pk += 1
+    reviews = range(task['review_start'], review_pk)
+    if reviews and task['comments']:
+        hot = ZipfSampler(reviews, task['zipf'], rng.random())
+        with BulkWriter(Comment, batch_size, use_copy) as writer:
+            for offset in range(task['comments']):
+                pk = task['comment_start'] + offset
+                writer.write(Comment(
+                    pk=pk, review_id=hot.sample(rng)[0],
+                    author_id=users.sample(rng)[0],
+                    text=f'Комментарий {pk}',
+                    pub_date=now - DATE_SPREAD * rng.random()
+                ))
+    return review_pk - task['review_start'], task['comments']
+
+
+class DataGenerator:
+    """
+    Детерминированное заполнение базы: одинаковые seed и размеры
+    дают одинаковые данные. Популярность произведений, отзывов
+    и активность пользователей распределены по закону Ципфа.
+    Объекты получают явные id, поэтому связи строятся без чтения
+    вставленных строк, а отзывы и комментарии пишутся пачками
+    в параллельных процессах.
+    """
+
+    def __init__(self, counts=None, seed=0, batch_size=5000, use_copy=True,
+                 zipf=DEFAULT_ZIPF, workers=1):
+        self.counts = {**DEFAULT_COUNTS, **(counts or {})}
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.zipf = zipf
+        self.workers = workers
+        if connections['default'].vendor == 'sqlite':
+            # SQLite не допускает параллельной записи
+            self.workers = 1
+        self.now = timezone.now()
+
+    def writer(self, model):
+        return BulkWriter(model, self.batch_size, self.use_copy)
+
+    def generate(self):
+        """Заполнение всех таблиц и пересчет производных данных"""
+        if self.counts['reviews'] > self.counts['users'] * self.counts[
+            'titles'
+        ]:
+            raise ValueError(
+                'Отзывов больше, чем пар пользователь — произведение'
+            )
+        users = self.users()
+        categories = self.rubrics(Category, 'categories')
+        genres = self.rubrics(Genre, 'genres')
+        titles = self.titles(categories, genres)
+        self.reviews(users, titles)
+        rebuild_ratings()
+        rebuild_facets()
+        for model in (Category, Genre):
+            invalidate(model._meta.label_lower)
+        invalidate(TITLE_CARDS)
+        invalidate(RANKING)
+        invalidate(TITLE_SEARCH)
+        invalidate(AUTOCOMPLETE)
+        touch('titles')
+
+    def users(self):
+        start = first_pk(User)
+        password = make_password(None)
+        ids = range(start, start + self.counts['users'])
+        with self.writer(User) as writer:
+            for pk in ids:
+                writer.write(User(
+                    pk=pk, username=f'user{pk}', email=f'user{pk}@yamdb.fake',
+                    password=password, date_joined=self.now
+                ))
+        return ids
+
+    def rubrics(self, model, name):
+        start = first_pk(model)
+        ids = range(start, start + self.counts[name])
+        with self.writer(model) as writer:
+            for pk in ids:
+                writer.write(model(
+                    pk=pk, name=f'{model._meta.verbose_name} {pk}',
+                    slug=f'{model._meta.model_name}-{pk}'
+                ))
+        return ids
+
+    def titles(self, categories, genres):
+        start = first_pk(Title)
+        ids = range(start, start + self.counts['titles'])
+        categories = ZipfSampler(categories, self.zipf, self.seed)
+        genres = ZipfSampler(genres, self.zipf, self.seed)
+        with self.writer(Title) as titles, self.writer(
+            Title.genre.through
+        ) as links:
+            for pk in ids:
+                titles.write(Title(
+                    pk=pk, name=f'Произведение {pk}',
+                    year=self.random.randint(1950, self.now.year),
+                    category_id=categories.sample(self.random)[0]
+                    if len(categories) else None
+                ))
+            titles.flush()
+            for pk in ids:
+                count = self.random.randint(
+                    0, min(MAX_GENRES_PER_TITLE, len(genres))
+                )
+                for genre_id in genres.distinct(self.random, count):
+                    links.write(
+                        Title.genre.through(title_id=pk, genre_id=genre_id)
+                    )
+        return ids
+
+    def review_counts(self, users, titles):
+        """
+        Число отзывов на каждое произведение: не больше числа
+        пользователей, излишек раздается равномерно.
+        """
+        sampler = ZipfSampler(titles, self.zipf, self.seed)
+        counts = Counter()
+        total = self.counts['reviews']
+        for offset in range(0, total, DRAW_BATCH):
+            counts.update(
+                sampler.sample(self.random, min(DRAW_BATCH, total - offset))
+            )
+
+        def clamp():
+            overflow = 0
+            for title_id, count in counts.items():
+                if count > len(users):
+                    overflow += count - len(users)
+                    counts[title_id] = len(users)
+            return overflow
+
+        overflow = clamp()
+        while overflow:
+            counts.update(self.random.choices(
+                [pk for pk in titles if counts[pk] < len(users)], k=overflow
+            ))
+            overflow = clamp()
+        return [(pk, counts[pk]) for pk in titles if counts[pk]]
+
+    def tasks(self, users, titles):
+        """Пачки произведений с заранее распределенными id"""
+        review_start, comment_start = first_pk(Review), first_pk(Comment)
+        chunks, chunk = [], []
+        size = 0
+        for title_id, count in self.review_counts(users, titles):
+            chunk.append((title_id, count))
+            size += count
+            if size >= CHUNK_REVIEWS:
+                chunks.append((chunk, size))
+                chunk, size = [], 0
+        if chunk:
+            chunks.append((chunk, size))
+        total = self.counts['reviews']
+        assigned = 0
+        for number, (chunk, size) in enumerate(chunks):
+            comments = (
+                self.counts['comments'] - assigned
+                if number == len(chunks) - 1
+                else self.counts['comments'] * size // total
+            )
+            yield {
+                'seed': self.seed, 'chunk': number, 'titles': chunk,
+                'users': (users.start, len(users)), 'zipf': self.zipf,
+                'review_start': review_start, 'comment_start': comment_start,
+                'comments': comments, 'now': self.now,
+                'batch': self.batch_size, 'copy': self.use_copy,
+            }
+            review_start += size
+            comment_start += comments
+            assigned += comments
+
+    def reviews(self, users, titles):
+        """Отзывы и комментарии, при нескольких процессах — параллельно"""
+        tasks = list(self.tasks(users, titles))
+        if self.workers > 1 and len(tasks) > 1:
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(
+                self.workers
+            ) as pool:
+                written = pool.map(write_chunk, tasks, chunksize=1)
+            reset_sequences(Review, Comment)
+        else:
+            written = [write_chunk(task) for task in tasks]
+        return [sum(counts) for counts in zip(*written)] or [0, 0]
@@ -0,0 +1,207 @@
+"""Модуль выгрузки каталога в формате NDJSON"""
+import json
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.models import Q
+from reviews.models import Comment, Review, Title
+
+from .records import date_record
+
+CHUNK_SIZE = 500
+ROWS = 2000
+BUFFER_SIZE = 64 * 1024
+REVIEW_FIELDS = (
+    'id', 'title_id', 'text', 'author__username', 'score', 'pub_date'
+)
+COMMENT_FIELDS = (
+    'id', 'review__title_id', 'review_id', 'text', 'author__username',
+    'pub_date'
+)
+
+
+def rubric_record(rubric):
+    return None if rubric is None else {
+        'name': rubric.name, 'slug': rubric.slug
+    }
+
+
+def title_record(title):
+    """Поля произведения с рубриками, без отзывов"""
+    return {
+        'id': title.pk,
+        'name': title.name,
+        'year': title.year,
+        'rating': title.rating,
+        'description': title.description,
+        'category': rubric_record(title.category),
+        'genre': [rubric_record(genre) for genre in title.genre.all()],
+    }
+
+
+def review_record(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'author': row['author__username'],
+        'score': row['score'],
+        'pub_date': date_record(row['pub_date']),
+    }
+
+
+def comment_record(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'author': row['author__username'],
+        'pub_date': date_record(row['pub_date']),
+    }
+
+
+def after(fields, values):
+    """Условие «строка после values» по возрастанию fields"""
+    condition = Q()
+    for position, field in enumerate(fields):
+        condition |= Q(
+            **dict(zip(fields[:position], values[:position])),
+            **{f'{field}__gt': values[position]}
+        )
+    return condition
+
+
+def keyset(queryset, fields, size):
+    """
+    Строки values() по возрастанию fields пачками по size:
+    каждая пачка выбирается условием от последней строки, без OFFSET.
+    """
+    page = queryset.order_by(*fields)
+    while True:
+        rows = list(page[:size])
+        yield from rows
+        if len(rows) < size:
+            return
+        page = queryset.order_by(*fields).filter(
+            after(fields, [rows[-1][field] for field in fields])
+        )
+
+
+class Rows:
+    """Итератор строк с просмотром следующей"""
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.next = next(self.rows, None)
+
+    def key(self, fields):
+        return tuple(self.next[field] for field in fields)
+
+    def take(self, fields, values):
+        """
+        Идущие подряд строки с ключом fields, равным values.
+        Строки с меньшим ключом пропускаются: их родителя нет
+        в выгрузке, и они не должны задерживать поток.
+        """
+        values = tuple(values)
+        while self.next is not None and self.key(fields) < values:
+            self.next = next(self.rows, None)
+        while self.next is not None and self.key(fields) == values:
+            row, self.next = self.next, next(self.rows, None)
+            yield row
+
+
+def opened(record, field):
+    """JSON объекта без закрывающей скобки и с началом списка field"""
+    return json.dumps(record, ensure_ascii=False)[:-1] + f', "{field}": ['
+
+
+def title_lines(titles, size):
+    """
+    Части строк NDJSON для пачки произведений. Отзывы всей пачки
+    и их комментарии читаются двумя потоками keyset-пачек по size
+    строк в порядке вывода, поэтому в памяти не бывает больше size
+    отзывов и комментариев даже у самого популярного произведения.
+    """
+    ids = [title.pk for title in titles]
+    reviews = Rows(keyset(
+        Review.objects.filter(title_id__in=ids).values(*REVIEW_FIELDS),
+        ('title_id', 'id'), size
+    ))
+    comments = Rows(keyset(
+        Comment.objects.filter(review__title_id__in=ids).values(
+            *COMMENT_FIELDS
+        ),
+        ('review__title_id', 'review_id', 'id'), size
+    ))
+    for title in titles:
+        yield opened(title_record(title), 'reviews')
+        for number, review in enumerate(
+            reviews.take(('title_id',), (title.pk,))
+        ):
+            yield (', ' if number else '') + opened(
+                review_record(review), 'comments'
+            )
+            yield ', '.join(
+                json.dumps(comment_record(comment), ensure_ascii=False)
+                for comment in comments.take(
+                    ('review__title_id', 'review_id'),
+                    (title.pk, review['id'])
+                )
+            )
+            yield ']}'
+        yield ']}\n'
+
+
+@contextmanager
+def read_snapshot():
+    """
+    Транзакция, все запросы которой видят один снимок базы.
+    В PostgreSQL — REPEATABLE READ только для чтения, SQLite держит
+    снимок на время любой транзакции чтения.
+    """
+    outer = connection.in_atomic_block
+    with transaction.atomic():
+        if not outer and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ '
+                    'READ ONLY'
+                )
+        yield
+
+
+def export_catalog(chunk_size=CHUNK_SIZE, rows=ROWS):
+    """
+    Части строк NDJSON, по одной строке на произведение.
+    Произведения выбираются пачками по chunk_size по возрастанию id
+    без OFFSET, отзывы и комментарии — пачками по rows строк,
+    поэтому расход памяти не зависит ни от размера каталога, ни от
+    числа отзывов у одного произведения. Части одной строки
+    склеиваются, пока не наберется BUFFER_SIZE символов.
+    Все запросы идут в одном снимке, поэтому потоки произведений,
+    отзывов и комментариев согласованы при параллельной записи.
+    """
+    with read_snapshot():
+        yield from catalog_parts(chunk_size, rows)
+
+
+def catalog_parts(chunk_size, rows):
+    """Части строк NDJSON без транзакции, см. export_catalog"""
+    last_pk = 0
+    buffer, buffered = [], 0
+    while True:
+        titles = list(
+            Title.objects.filter(pk__gt=last_pk).order_by('pk')
+            .select_related('category').prefetch_related('genre')
+            [:chunk_size]
+        )
+        if not titles:
+            break
+        for part in title_lines(titles, rows):
+            buffer.append(part)
+            buffered += len(part)
+            if buffered >= BUFFER_SIZE or part.endswith('\n'):
+                yield ''.join(buffer)
+                buffer, buffered = [], 0
+        last_pk = titles[-1].pk
+    if buffer:
+        yield ''.join(buffer)
@@ -0,0 +1,213 @@
+"""Модуль счетчиков фильтров каталога произведений"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from reviews.models import Category, Genre, Title, TitleFacet
+
+
+def title_counts(category_id, year, genre_ids=()):
+    """Вклад одного произведения в счетчики"""
+    category_key = category_id or TitleFacet.NO_CATEGORY
+    return Counter(
+        (genre_key, category_key, year)
+        for genre_key in (TitleFacet.ANY_GENRE, *genre_ids)
+    )
+
+
+def snapshot(ids):
+    """
+    Вклад произведений в счетчики: ключ (жанр, категория, год) —
+    число произведений. Два запроса независимо от числа ids.
+    """
+    ids = list(ids)
+    counts = Counter()
+    if not ids:
+        return counts
+    genres = defaultdict(list)
+    for title_id, genre_id in Title.genre.through.objects.filter(
+        title_id__in=ids
+    ).values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    for pk, category_id, year in Title.objects.filter(
+        pk__in=ids
+    ).values_list('pk', 'category_id', 'year'):
+        counts.update(title_counts(category_id, year, genres[pk]))
+    return counts
+
+
+def add_count(genre_key, category_key, year, delta):
+    """Изменение одного счетчика с созданием недостающей строки"""
+    facets = TitleFacet.objects.filter(
+        genre_key=genre_key, category_key=category_key, year=year
+    )
+    if facets.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            TitleFacet.objects.create(
+                genre_key=genre_key, category_key=category_key,
+                year=year, count=delta
+            )
+    except IntegrityError:
+        # строку успела создать параллельная транзакция
+        facets.update(count=F('count') + delta)
+
+
+def apply_changes(old, new):
+    """
+    Перенос разницы двух снимков в таблицу счетчиков.
+    Несколько счетчиков меняются одним bulk_update, недостающие
+    строки вставляются одним bulk_create.
+    """
+    deltas = {
+        key: new[key] - old[key]
+        for key in sorted(old.keys() | new.keys()) if new[key] != old[key]
+    }
+    if len(deltas) <= 1:
+        for key, delta in deltas.items():
+            add_count(*key, delta)
+        return
+    genre_keys, category_keys, years = map(set, zip(*deltas))
+    found = []
+    for facet in TitleFacet.objects.filter(
+        genre_key__in=genre_keys, category_key__in=category_keys,
+        year__in=years
+    ).order_by('pk'):
+        delta = deltas.pop(
+            (facet.genre_key, facet.category_key, facet.year), None
+        )
+        if delta is not None:
+            facet.count = F('count') + delta
+            found.append(facet)
+    TitleFacet.objects.bulk_update(found, ['count'])
+    if not deltas:
+        return
+    try:
+        with transaction.atomic():
+            TitleFacet.objects.bulk_create(
+                TitleFacet(
+                    genre_key=genre_key, category_key=category_key,
+                    year=year, count=delta
+                )
+                for (genre_key, category_key, year), delta in deltas.items()
+            )
+    except IntegrityError:
+        for key, delta in deltas.items():
+            add_count(*key, delta)
+
+
+def rebuild_facets():
+    """Полный пересчет счетчиков двумя запросами с GROUP BY"""
+    facets = [
+        TitleFacet(
+            genre_key=TitleFacet.ANY_GENRE,
+            category_key=row['category_id'] or TitleFacet.NO_CATEGORY,
+            year=row['year'], count=row['total']
+        )
+        for row in Title.objects.order_by().values(
+            'category_id', 'year'
+        ).annotate(total=Count('pk'))
+    ]
+    facets.extend(
+        TitleFacet(
+            genre_key=row['genre_id'],
+            category_key=row['title__category_id'] or TitleFacet.NO_CATEGORY,
+            year=row['title__year'], count=row['total']
+        )
+        for row in Title.genre.through.objects.order_by().values(
+            'genre_id', 'title__category_id', 'title__year'
+        ).annotate(total=Count('pk'))
+    )
+    TitleFacet.objects.all().delete()
+    TitleFacet.objects.bulk_create(facets)
+    return len(facets)
+
+
+def rubric_counts(model, counts):
+    """Слаги и названия рубрик для счетчиков {id: число}"""
+    rubrics = model.objects.in_bulk(list(counts))
+    return sorted(
+        (
+            {'slug': rubric.slug, 'name': rubric.name, 'count': counts[pk]}
+            for pk, rubric in rubrics.items()
+        ),
+        key=lambda item: item['name']
+    )
+
+
+def year_counts(counts):
+    return [
+        {'year': year, 'count': count}
+        for year, count in sorted(counts.items())
+    ]
+
+
+def get_facets(genre=None, category=None, year=None):
+    """
+    Число произведений по каждому значению фильтра при выбранных
+    остальных фильтрах. Читается из таблицы счетчиков.
+    """
+    genre_key = TitleFacet.ANY_GENRE
+    if genre is not None:
+        genre_key = Genre.objects.filter(slug=genre).values_list(
+            'pk', flat=True
+        ).first()
+    category_key = None
+    if category is not None:
+        category_key = Category.objects.filter(slug=category).values_list(
+            'pk', flat=True
+        ).first()
+    by_year = {} if year is None else {'year': year}
+
+    def totals(field, **filters):
+        # неизвестный слаг в фильтре дает пустой список
+        if None in filters.values():
+            return {}
+        return {
+            row[field]: row['total']
+            for row in TitleFacet.objects.filter(**filters).order_by()
+            .values(field).annotate(total=Sum('count'))
+            .filter(total__gt=0)
+        }
+
+    by_category = {} if category is None else {'category_key': category_key}
+    genres = totals('genre_key', genre_key__gt=0, **by_category, **by_year)
+    categories = totals(
+        'category_key', genre_key=genre_key,
+        category_key__gt=TitleFacet.NO_CATEGORY, **by_year
+    )
+    years = totals('year', genre_key=genre_key, **by_category)
+    return {
+        'genre': rubric_counts(Genre, genres),
+        'category': rubric_counts(Category, categories),
+        'year': year_counts(years)
+    }
+
+
+def get_live_facets(queryset, filterset_class, params, request=None):
+    """
+    Подсчет по произведениям напрямую: нужен, когда среди фильтров
+    есть условие, не представленное в таблице счетчиков.
+    """
+    def filtered(facet):
+        data = {key: value for key, value in params.items() if key != facet}
+        return filterset_class(
+            data, queryset=queryset, request=request
+        ).qs.order_by()
+
+    def totals(queryset, field):
+        return {
+            row[field]: row['total']
+            for row in queryset.values(field)
+            .annotate(total=Count('pk', distinct=True))
+            if row[field] is not None
+        }
+
+    return {
+        'genre': rubric_counts(Genre, totals(filtered('genre'), 'genre')),
+        'category': rubric_counts(
+            Category, totals(filtered('category'), 'category')
+        ),
+        'year': year_counts(totals(filtered('year'), 'year'))
+    }
@@ -1,11 +1,12 @@
 import django_filters
 from reviews.models import Title
 
+from .search import search_titles
+
 
 class TitleFilter(django_filters.FilterSet):
     """Фильтр по названию, году выхода, жанру и категории"""
-    name = django_filters.CharFilter(field_name='name',
-                                     lookup_expr='icontains')
+    name = django_filters.CharFilter(method='filter_name')
     year = django_filters.NumberFilter(field_name='year')
     genre = django_filters.CharFilter(field_name='genre__slug')
     category = django_filters.CharFilter(field_name='category__slug')
@@ -13,3 +14,9 @@ class TitleFilter(django_filters.FilterSet):
     class Meta:
         model = Title
         fields = ('name', 'year', 'genre', 'category')
+
+    def filter_name(self, queryset, name, value):
+        queryset, truncated = search_titles(queryset, value)
+        if truncated and self.request is not None:
+            self.request.search_truncated = True
+        return queryset
@@ -0,0 +1,94 @@
+"""Модуль нагрузочного тестирования API на тестовой базе"""
+import json
+
+from api.benchmark import SCENARIOS, Benchmark, compare
+from api.datagen import DEFAULT_COUNTS, DataGenerator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = ('Seeds a throwaway test database, runs API scenarios and '
+            'compares the results with a baseline')
+
+    def add_arguments(self, parser):
+        for name, count in DEFAULT_COUNTS.items():
+            parser.add_argument(
+                f'--{name}', type=int, default=count,
+                help=f'Number of generated {name}'
+            )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--requests', type=int, default=100,
+            help='Number of requests per scenario'
+        )
+        parser.add_argument(
+            '--scenario', action='append', choices=SCENARIOS,
+            dest='scenarios', help='Run only the given scenarios'
+        )
+        parser.add_argument(
+            '--output', help='Write the results to a JSON file'
+        )
+        parser.add_argument(
+            '--baseline', help='Compare with results from a JSON file'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed p50 slowdown relative to the baseline'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        counts = {name: options[name] for name in DEFAULT_COUNTS}
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        try:
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                DataGenerator(counts, options['seed']).generate()
+                results = Benchmark(
+                    options['requests'], options['seed']
+                ).run(options['scenarios'] or SCENARIOS)
+        except (RuntimeError, ValueError) as error:
+            raise CommandError(error)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        self.report(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2)
+        if baseline is not None:
+            regressions = compare(results, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError(
+                    'Хуже базовых результатов:\n' + '\n'.join(regressions)
+                )
+
+    def report(self, results, baseline):
+        self.stdout.write(
+            f'{"сценарий":<14}{"req/s":>10}{"p50, мс":>10}'
+            f'{"p99, мс":>10}{"запросов":>10}{"p50/база":>10}'
+        )
+        for name, result in results.items():
+            ratio = ''
+            if baseline and name in baseline and baseline[name]['p50']:
+                ratio = f'{result["p50"] / baseline[name]["p50"]:.2f}'
+            self.stdout.write(
+                f'{name:<14}{result["rps"]:>10}{result["p50"]:>10}'
+                f'{result["p99"]:>10}{result["queries"]:>10}{ratio:>10}'
+            )
@@ -0,0 +1,38 @@
+"""Модуль выгрузки каталога"""
+import sys
+import time
+
+from api.export import CHUNK_SIZE, export_catalog
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Exports titles with reviews and comments as NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', '-o',
+            help='Output file, stdout by default'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Number of titles fetched per query'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        output = sys.stdout
+        if options['output']:
+            output = open(options['output'], 'w', encoding='utf-8')
+        written = 0
+        try:
+            for part in export_catalog(options['chunk_size']):
+                output.write(part)
+                written += part.count('\n')
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        self.stderr.write(
+            f'Выгружено произведений: {written} '
+            f'за {time.perf_counter() - started:.2f} с'
+        )
@@ -0,0 +1,15 @@
+"""Модуль пересчета счетчиков фильтров"""
+from api.cache import touch
+from api.facets import rebuild_facets
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds genre, category and year counters of titles'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        rows = rebuild_facets()
+        touch('titles')
+        self.stdout.write(f'Пересчитано счетчиков фильтров: {rows}')
@@ -0,0 +1,16 @@
+"""Модуль пересчета рейтингов произведений"""
+from api.cache import RANKING, TITLE_CARDS, invalidate
+from api.services import rebuild_ratings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds rating counters of all titles from their reviews'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        updated = rebuild_ratings()
+        invalidate(TITLE_CARDS)
+        invalidate(RANKING)
+        self.stdout.write(f'Пересчитан рейтинг произведений: {updated}')
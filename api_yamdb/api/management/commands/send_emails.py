@@ -0,0 +1,43 @@
+"""Модуль фоновой отправки писем из очереди"""
+import time
+
+from api.services import send_outbox
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Sends queued emails in batches over a single mail connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.REVIEW['OUTBOX_BATCH_SIZE'],
+            help='Number of emails taken from the outbox at once'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait when the outbox is empty'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the outbox and exit instead of polling'
+        )
+
+    def handle(self, *args, **options):
+        # соединение открывается при первой отправке и заново после обрыва
+        connection = get_connection(fail_silently=False)
+        total = 0
+        try:
+            while True:
+                processed = send_outbox(connection, options['batch_size'])
+                total += processed
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            connection.close()
+            self.stdout.write(f'Обработано писем: {total}')
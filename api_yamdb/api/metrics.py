@@ -0,0 +1,239 @@
+"""Модуль метрик производительности запросов"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from hmac import compare_digest
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+UNMATCHED = ('unmatched', '')
+# метод вне списка попадает в метку other: иначе произвольные
+# методы клиентов порождали бы новые серии без ограничения
+HTTP_METHODS = (
+    'get', 'post', 'put', 'patch', 'delete', 'head', 'options', 'trace'
+)
+OTHER_METHOD = 'other'
+
+current_stats = ContextVar('current_stats', default=None)
+
+
+class RequestStats:
+    """Показатели одного запроса: обращения к базе и сериализация"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.label = UNMATCHED
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+@contextmanager
+def serializer_timer():
+    """
+    Время сериализации в показателях запроса.
+    Учитывается только внешний вызов: вложенные сериализаторы
+    входят во время родителя.
+    """
+    stats = current_stats.get()
+    if stats is None or stats.serializer_depth:
+        yield
+        return
+    stats.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_time += time.perf_counter() - started
+        stats.serializer_depth -= 1
+
+
+class TimedSerializerMixin:
+    """Учет времени сериализации в показателях запроса"""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class Registry:
+    """
+    Гистограммы длительности и счетчики по представлениям и действиям.
+    Хранятся в памяти процесса: каждый воркер отдает свои метрики.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.series = {}
+
+    def observe(self, label, duration, stats, size):
+        with self.lock:
+            series = self.series.get(label)
+            if series is None:
+                series = self.series[label] = {
+                    'buckets': [0] * (len(self.buckets) + 1),
+                    'count': 0, 'duration': 0.0, 'queries': 0,
+                    'db': 0.0, 'serializer': 0.0, 'bytes': 0, 'streamed': 0
+                }
+            series['buckets'][bisect_left(self.buckets, duration)] += 1
+            series['count'] += 1
+            series['duration'] += duration
+            series['queries'] += stats.queries
+            series['db'] += stats.db_time
+            series['serializer'] += stats.serializer_time
+            if size is None:
+                series['streamed'] += 1
+            else:
+                series['bytes'] += size
+
+    def render(self):
+        """Текстовый формат Prometheus"""
+        with self.lock:
+            series = {
+                label: dict(values, buckets=list(values['buckets']))
+                for label, values in sorted(self.series.items())
+            }
+        lines = [
+            '# HELP yamdb_request_duration_seconds Request wall time.',
+            '# TYPE yamdb_request_duration_seconds histogram',
+        ]
+        for label, values in series.items():
+            labels = label_pairs(label)
+            total = 0
+            for bound, count in zip(self.buckets, values['buckets']):
+                total += count
+                lines.append(
+                    'yamdb_request_duration_seconds_bucket'
+                    f'{{{labels},le="{bound}"}} {total}'
+                )
+            lines.append(
+                'yamdb_request_duration_seconds_bucket'
+                f'{{{labels},le="+Inf"}} {values["count"]}'
+            )
+            lines.append(
+                f'yamdb_request_duration_seconds_sum{{{labels}}} '
+                f'{values["duration"]}'
+            )
+            lines.append(
+                f'yamdb_request_duration_seconds_count{{{labels}}} '
+                f'{values["count"]}'
+            )
+        for name, key, description in COUNTERS:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} counter')
+            for label, values in series.items():
+                lines.append(f'{name}{{{label_pairs(label)}}} {values[key]}')
+        return '\n'.join(lines) + '\n'
+
+
+COUNTERS = (
+    ('yamdb_db_queries_total', 'queries', 'Database queries.'),
+    ('yamdb_db_seconds_total', 'db', 'Time spent in database queries.'),
+    ('yamdb_serializer_seconds_total', 'serializer',
+     'Time spent in serializers.'),
+    ('yamdb_response_bytes_total', 'bytes',
+     'Response body size, streaming responses excluded.'),
+    ('yamdb_streamed_responses_total', 'streamed',
+     'Streaming responses of unknown size.'),
+)
+
+registry = Registry(settings.REVIEW['METRICS_BUCKETS'])
+
+
+def escape_label(value):
+    """Экранирование значения метки в текстовом формате Prometheus"""
+    return (
+        str(value).replace('\\', '\\\\')
+        .replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+def label_pairs(label):
+    view, action = label
+    return f'view="{escape_label(view)}",action="{escape_label(action)}"'
+
+
+def view_label(view_func, method):
+    """Имя представления и действие viewset для метрик"""
+    cls = getattr(view_func, 'cls', None)
+    name = getattr(cls, '__name__', None) or view_func.__name__
+    actions = getattr(view_func, 'actions', None) or {}
+    method = method.lower()
+    if method in actions:
+        return name, actions[method]
+    return name, method if method in HTTP_METHODS else OTHER_METHOD
+
+
+def server_timing(duration, stats):
+    return ', '.join((
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+        f'serializer;dur={stats.serializer_time * 1000:.1f}',
+        f'total;dur={duration * 1000:.1f}',
+    ))
+
+
+class MetricsMiddleware:
+    """
+    Длительность, число и время запросов к базе, время сериализации
+    и размер ответа по каждому представлению и действию.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        duration = time.perf_counter() - started
+        size = None if response.streaming else len(response.content)
+        registry.observe(stats.label, duration, stats, size)
+        if settings.REVIEW['SERVER_TIMING']:
+            response['Server-Timing'] = server_timing(duration, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = current_stats.get()
+        if stats is not None:
+            stats.label = view_label(view_func, request.method)
+
+
+def metrics(request):
+    """
+    Метрики процесса в текстовом формате Prometheus. Доступны только
+    с заголовком Authorization: Bearer METRICS_TOKEN; без заданного
+    токена закрыты для всех.
+    """
+    token = settings.REVIEW['METRICS_TOKEN']
+    if not token or not compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', '').encode(),
+        f'Bearer {token}'.encode()
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки фоновым обработчиком"""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUSES = (
+        (PENDING, 'ожидает отправки'),
+        (SENT, 'отправлено'),
+        (FAILED, 'не отправлено')
+    )
+
+    address = models.EmailField('адрес', max_length=254)
+    subject = models.CharField('тема', max_length=255)
+    body = models.TextField('текст')
+    status = models.CharField(
+        'статус',
+        max_length=max(len(key) for key, _ in STATUSES),
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('попыток отправки', default=0)
+    last_error = models.TextField('последняя ошибка', blank=True)
+    created = models.DateTimeField('дата создания', auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        'следующая попытка', default=timezone.now
+    )
+    sent = models.DateTimeField('дата отправки', null=True, blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt'],
+                name='outbox_status_next_idx'
+            )
+        ]
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'исходящие письма'
+
+    def __str__(self):
+        return f'{self.address}: {self.subject}'
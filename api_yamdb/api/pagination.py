@@ -0,0 +1,207 @@
+"""Модуль классов пагинации"""
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as DecodeError
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import (EmptyPage, InvalidPage, Page,
+                                   PageNotAnInteger, Paginator)
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    Оценка числа строк по плану запроса PostgreSQL.
+    На остальных СУБД выполняется точный подсчет.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CountlessPage(Page):
+    has_more = False
+
+    def has_next(self):
+        return self.has_more
+
+
+class CountlessPaginator(Paginator):
+    """
+    Пагинатор без COUNT(*): о следующей странице говорит
+    лишняя строка, выбранная вместе с текущей.
+    """
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы не является целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('На этой странице нет результатов')
+        page = CountlessPage(rows[:self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (pub_date, id) от новых записей к старым.
+    Страница выбирается условием по индексу, без OFFSET и COUNT(*).
+    Записи без pub_date, созданные в обход auto_now_add, ключа
+    не имеют и в ленту не попадают.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            reverse, pub_date, pk = (
+                b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            )
+            cursor = bool(int(reverse)), parse_datetime(pub_date), int(pk)
+        except (DecodeError, UnicodeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if cursor[1] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, reverse, instance):
+        cursor = '|'.join((
+            str(int(reverse)), instance.pub_date.isoformat(), str(instance.id)
+        ))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param,
+            b64encode(cursor.encode('ascii')).decode('ascii')
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor[0])
+        queryset = queryset.filter(pub_date__isnull=False)
+        if cursor is None:
+            queryset = queryset.order_by('-pub_date', '-id')
+        elif reverse:
+            _, pub_date, pk = cursor
+            queryset = queryset.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+            ).order_by('pub_date', 'id')
+        else:
+            _, pub_date, pk = cursor
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+            ).order_by('-pub_date', '-id')
+        page = list(queryset[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if reverse:
+            page.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+        self.next = self.previous = None
+        if page and has_next:
+            self.next = self.encode_cursor(False, page[-1])
+        if page and has_previous:
+            self.previous = self.encode_cursor(True, page[0])
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.next),
+            ('previous', self.previous),
+            ('results', data)
+        ]))
+
+
+class BaseInfoPagination(PageNumberPagination):
+    """
+    Постраничный вывод отзывов и комментариев.
+    С параметром cursor (для первой страницы пустым) включается
+    пагинация по ключу.
+    """
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(PageNumberPagination):
+    """
+    Страницы произведений с размером, заданным клиентом.
+    Параметр count: exact — точный COUNT(*), estimate — оценка
+    планировщика, none — без подсчета.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = settings.REVIEW['MAX_PAGE_SIZE']
+    count_query_param = 'count'
+    count_modes = ('exact', 'estimate', 'none')
+    count_mode = settings.REVIEW['TITLE_COUNT_MODE']
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param)
+        return mode if mode in self.count_modes else self.count_mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode == 'exact':
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        paginator = CountlessPaginator(queryset, self.get_page_size(request))
+        page_number = request.query_params.get(self.page_query_param, 1)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.count_mode == 'exact':
+            return super().get_paginated_response(data)
+        count = None
+        if self.count_mode == 'estimate':
+            count = estimate_count(self.page.paginator.object_list)
+        return Response(OrderedDict([
+            ('count', count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
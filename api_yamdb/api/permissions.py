@@ -8,6 +8,15 @@ class IsAdminAsDefinedByUserModel(permissions.BasePermission):
         return request.user.is_authenticated and request.user.is_admin
 
 
+class IsAdminOrModerator(permissions.BasePermission):
+    """Allows access to administrators and moderators"""
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_admin
+            or request.user.role == YamdbUser.MODERATOR
+        )
+
+
 class IsAdminUserOrReadOnly(permissions.BasePermission):
     """Allows access only to administrators or read only."""
     def has_permission(self, request, view):
@@ -0,0 +1,9 @@
+"""Модуль общих представлений полей для чтения и выгрузки"""
+from rest_framework.fields import DateTimeField
+
+pub_date_field = DateTimeField()
+
+
+def date_record(value):
+    """Дата в формате DRF, None остается None"""
+    return None if value is None else pub_date_field.to_representation(value)
@@ -0,0 +1,223 @@
+"""Модуль поиска произведений по названию"""
+import heapq
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Length
+from reviews.models import Title
+
+from .cache import TITLE_SEARCH, get_changes, get_version, publish_changes
+
+GRAM = 3
+# заголовок ответа с пределом, до которого усечены совпадения поиска
+TRUNCATED_HEADER = 'X-Search-Truncated'
+
+
+def normalize(text):
+    return text.casefold()
+
+
+def trigrams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def rank_key(name, query):
+    """Сначала названия с запроса, затем более короткие"""
+    return not name.startswith(query), len(name)
+
+
+class MemoryIndex(ABC):
+    """
+    Индекс в памяти процесса. Изменения публикуются после фиксации
+    транзакции: версия namespace в кэше растет, а сами изменения
+    сохраняются под новой версией. Отставший процесс применяет
+    журнал и перестраивает индекс из базы, только если журнал
+    потерян или отставание больше INDEX_CHANGES_MAX.
+    """
+    namespace = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.clear()
+
+    @abstractmethod
+    def clear(self):
+        """Пустой индекс"""
+
+    @abstractmethod
+    def load(self):
+        """Заполнение пустого индекса из базы"""
+
+    @abstractmethod
+    def apply(self, change):
+        """Внесение изменения; повторное внесение ничего не меняет"""
+
+    def catch_up(self, version):
+        """Применение журнала до version; False, если его не хватает"""
+        if self.version is None or not (
+            0 < version - self.version
+            <= settings.REVIEW['INDEX_CHANGES_MAX']
+        ):
+            return False
+        changes = get_changes(self.namespace, self.version + 1, version)
+        if changes is None:
+            return False
+        for change in changes:
+            self.apply(change)
+        return True
+
+    def sync(self):
+        """Переход к версии из кэша по журналу или перестроением"""
+        version = get_version(self.namespace)
+        if version == self.version:
+            return
+        if not self.catch_up(version):
+            self.clear()
+            self.load()
+        self.version = version
+
+    def warm_up(self):
+        """Построение при запуске; без доступа к базе — при обращении"""
+        try:
+            with self.lock:
+                self.sync()
+        except DatabaseError:
+            pass
+
+    def update(self, changes):
+        """
+        Публикация изменений после фиксации транзакции, так что
+        откат не оставляет их ни в журнале, ни в памяти.
+        """
+        changes = list(changes)
+        transaction.on_commit(lambda: self.publish(changes))
+
+    def publish(self, changes):
+        """
+        Свой индекс правится сразу, только если версия из incr
+        следует за его версией. Иначе между ними есть чужие
+        изменения, и индекс догонит их вместе со своими по журналу.
+        """
+        with self.lock:
+            version = publish_changes(self.namespace, changes)
+            if version is None or self.version is None or (
+                version != self.version + 1
+            ):
+                return
+            for change in changes:
+                self.apply(change)
+            self.version = version
+
+
+class TitleNameIndex(MemoryIndex):
+    """
+    Обратный индекс триграмм названий для СУБД без триграммных
+    индексов. Изменения — пары (id, название), None вместо
+    названия означает удаление.
+    """
+    namespace = TITLE_SEARCH
+
+    def clear(self):
+        self.names = {}
+        self.postings = defaultdict(set)
+
+    def load(self):
+        for pk, name in Title.objects.values_list('pk', 'name').iterator():
+            self.add(pk, name)
+
+    def apply(self, change):
+        pk, name = change
+        if name is None:
+            self.discard(pk)
+        else:
+            self.add(pk, name)
+
+    def add(self, pk, name):
+        self.discard(pk)
+        name = normalize(name)
+        self.names[pk] = name
+        for gram in trigrams(name):
+            self.postings[gram].add(pk)
+
+    def discard(self, pk):
+        name = self.names.pop(pk, None)
+        if name is None:
+            return
+        for gram in trigrams(name):
+            postings = self.postings[gram]
+            postings.discard(pk)
+            if not postings:
+                del self.postings[gram]
+
+    def search(self, query, limit):
+        """
+        id не более чем limit лучших произведений, в названии
+        которых есть query. Кандидаты — пересечение списков триграмм
+        запроса; короткие запросы проверяются по всем названиям.
+        """
+        query = normalize(query)
+        with self.lock:
+            self.sync()
+            grams = trigrams(query)
+            if grams:
+                postings = sorted(
+                    (self.postings.get(gram, set()) for gram in grams),
+                    key=len
+                )
+                candidates = postings[0].intersection(*postings[1:])
+            else:
+                candidates = self.names
+            names = self.names
+            return heapq.nsmallest(
+                limit,
+                (pk for pk in candidates if query in names[pk]),
+                key=lambda pk: (*rank_key(names[pk], query), pk)
+            )
+
+
+title_index = TitleNameIndex()
+
+
+def uses_trigram_index(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def index_titles(titles):
+    """Изменение названий для индекса в памяти, если он используется"""
+    if connections['default'].vendor != 'postgresql':
+        title_index.update(titles)
+
+
+def search_titles(queryset, query):
+    """
+    Произведения с query в названии и признак усечения. На PostgreSQL
+    icontains обслуживает триграммный GIN-индекс. На остальных СУБД
+    совпадения берутся из индекса в памяти до остальных фильтров, и
+    при их избытке остаются SEARCH_MAX_RESULTS лучших: тогда признак
+    истинен, а count и число страниц считаются по усеченному списку.
+    """
+    if uses_trigram_index(queryset):
+        return queryset.filter(name__icontains=query), False
+    limit = settings.REVIEW['SEARCH_MAX_RESULTS']
+    ids = title_index.search(query, limit + 1)
+    return queryset.filter(pk__in=ids[:limit]), len(ids) > limit
+
+
+def search_ordering(queryset, query):
+    """Порядок результатов поиска от наиболее похожих названий"""
+    if uses_trigram_index(queryset):
+        return TrigramSimilarity('name', query).desc(), 'id'
+    return (
+        Case(
+            When(name__istartswith=query, then=Value(0)),
+            default=Value(1), output_field=IntegerField()
+        ),
+        Length('name'),
+        'id'
+    )
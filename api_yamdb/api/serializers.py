@@ -1,8 +1,17 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import NotSupportedError, connection
+from django.utils.encoding import smart_str
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from rest_framework.validators import UniqueTogetherValidator
 from reviews.models import Category, Comment, Genre, Review, Title, User
 from reviews.validators import username_validator, validator_year
 
+from .authentication import user_reference
+from .facets import apply_changes, snapshot
+from .metrics import TimedSerializerMixin
 from .mixins import ValidateUsernameMixin
 
 
@@ -16,11 +25,18 @@ class CurrentTitleDefault:
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class CurrentAuthorDefault(serializers.CurrentUserDefault):
+    """Текущий пользователь в виде модели для проверки уникальности"""
+
+    def __call__(self, serializer_field):
+        return user_reference(super().__call__(serializer_field))
+
+
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
-        default=serializers.CurrentUserDefault()
+        default=CurrentAuthorDefault()
     )
     title = serializers.HiddenField(default=CurrentTitleDefault())
 
@@ -36,12 +52,17 @@ class ReviewSerializer(serializers.ModelSerializer):
             )
         ]
 
+    def update(self, instance, validated_data):
+        # произведение отзыва не меняется, а в данных лежит его id из адреса
+        validated_data.pop('title', None)
+        return super().update(instance, validated_data)
+
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
-        default=serializers.CurrentUserDefault()
+        default=CurrentAuthorDefault()
     )
 
     class Meta:
@@ -49,7 +70,7 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class RubricSerializer(serializers.ModelSerializer):
+class RubricSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Базовый сериализатор для сущностей с именем и кодом"""
     class Meta:
         fields = ('name', 'slug')
@@ -67,15 +88,149 @@ class GenreSerializer(RubricSerializer):
         model = Genre
 
 
-class WriteTitleSerializer(serializers.ModelSerializer):
+class PreloadedManyRelatedField(serializers.ManyRelatedField):
+    """Коды списка без предзагрузки выбираются одним запросом"""
+
+    def to_internal_value(self, data):
+        relation = self.child_relation
+        preloaded = self.context.setdefault('preloaded', {})
+        model = relation.queryset.model
+        if model not in preloaded and isinstance(data, list):
+            preloaded[model] = relation.get_queryset().in_bulk(
+                {smart_str(slug) for slug in data},
+                field_name=relation.slug_field
+            )
+        return super().to_internal_value(data)
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """Код ищется в словаре context['preloaded'], если он заполнен"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return PreloadedManyRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.queryset.model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            return preloaded[str(data)]
+        except KeyError:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field, value=smart_str(data)
+            )
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Пакетное изменение: объекты и данные сопоставляются по порядку"""
+
+    def update(self, instances, validated_data):
+        fields = set()
+        for instance, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+        if fields:
+            self.child.Meta.model.objects.bulk_update(instances, fields)
+        return instances
+
+
+class BulkTitleListSerializer(BulkListSerializer):
+    """
+    Пакетная запись произведений.
+    Коды категорий и жанров всей пачки загружаются двумя запросами,
+    произведения и связи с жанрами вставляются через bulk_create.
+    Счетчики фильтров обновляются по снимкам до и после записи.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            items = [item for item in data if isinstance(item, dict)]
+            categories = {
+                str(item['category']) for item in items if 'category' in item
+            }
+            genres = {
+                str(slug) for item in items
+                if isinstance(item.get('genre'), list)
+                for slug in item['genre']
+            }
+            self.context['preloaded'] = {
+                Category: Category.objects.in_bulk(
+                    categories, field_name='slug'
+                ),
+                Genre: Genre.objects.in_bulk(genres, field_name='slug')
+            }
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        returns_ids = connection.features.can_return_ids_from_bulk_insert
+        if not returns_ids and connection.vendor != 'sqlite':
+            raise NotSupportedError(
+                'Пакетное создание требует возврата id из bulk_create'
+            )
+        genres = [attrs.pop('genre', []) for attrs in validated_data]
+        titles = [Title(**attrs) for attrs in validated_data]
+        Title.objects.bulk_create(titles)
+        if not returns_ids:
+            # SQLite: запись в транзакции блокирует базу целиком,
+            # поэтому вставленные строки — последние по возрастанию id
+            ids = Title.objects.order_by('-pk').values_list(
+                'pk', flat=True
+            )[:len(titles)]
+            for title, pk in zip(titles, reversed(ids)):
+                title.pk = pk
+        self.set_genres(titles, genres)
+        apply_changes(Counter(), snapshot(title.pk for title in titles))
+        return self.reload(titles)
+
+    def update(self, instances, validated_data):
+        genres = [attrs.pop('genre', None) for attrs in validated_data]
+        counted = snapshot(title.pk for title in instances)
+        super().update(instances, validated_data)
+        changed = [
+            (title, title_genres)
+            for title, title_genres in zip(instances, genres)
+            if title_genres is not None
+        ]
+        if changed:
+            Title.genre.through.objects.filter(
+                title__in=[title for title, _ in changed]
+            ).delete()
+            self.set_genres(*zip(*changed))
+        apply_changes(counted, snapshot(title.pk for title in instances))
+        return self.reload(instances)
+
+    def set_genres(self, titles, genres):
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+            for title, title_genres in zip(titles, genres)
+            for genre in set(title_genres)
+        )
+
+    def reload(self, titles):
+        fresh = (
+            Title.objects.select_related('category')
+            .prefetch_related('genre')
+            .in_bulk([title.pk for title in titles])
+        )
+        return [fresh[title.pk] for title in titles]
+
+
+class WriteTitleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     year = serializers.IntegerField(
         validators=[validator_year()],
     )
-    category = serializers.SlugRelatedField(
+    category = PreloadedSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
+    genre = PreloadedSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True
@@ -87,9 +242,39 @@ class WriteTitleSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'name', 'year', 'description', 'genre', 'category', 'rating'
         )
+        list_serializer_class = BulkTitleListSerializer
+
+
+class ReviewModerationSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+
+    class Meta:
+        fields = ('id', 'text', 'score')
+        model = Review
+        list_serializer_class = BulkListSerializer
+
+
+class CommentModerationSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+
+    class Meta:
+        fields = ('id', 'text')
+        model = Comment
+        list_serializer_class = BulkListSerializer
+
+
+class BulkDeleteSerializer(serializers.Serializer):
+    """Непустой список id для пакетного удаления"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.REVIEW['BULK_MAX_ITEMS']
+    )
 
 
-class ReadTitleSerializer(serializers.ModelSerializer):
+class ReadTitleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
@@ -102,7 +287,9 @@ class ReadTitleSerializer(serializers.ModelSerializer):
         read_only_fields = ('__all__',)
 
 
-class UserSerializer(ValidateUsernameMixin, serializers.ModelSerializer):
+class UserSerializer(
+    TimedSerializerMixin, ValidateUsernameMixin, serializers.ModelSerializer
+):
     class Meta:
         model = User
         fields = (
@@ -1,9 +1,19 @@
 """Модуль вспомогательных функций"""
 import string
+from datetime import timedelta
 from random import choices
+from smtplib import SMTPException, SMTPServerDisconnected
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import (Case, Count, F, IntegerField, OuterRef, Q,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from reviews.models import Review, Title
+
+from .models import OutboxEmail
 
 SUBJECT = 'Подтверждение регистрации'
 MESSAGE = 'Для подтверждения используйте следующий код:\n{code}'
@@ -18,10 +28,155 @@ def generate_confirmation_code():
 
 
 def confirmation_email(address, confirmation_code):
-    """Отправка письма с кодом подтверждения"""
-    send_mail(
-        SUBJECT,
-        MESSAGE.format(code=confirmation_code),
-        settings.REVIEW['EMAIL_FROM'],
-        [address]
+    """Постановка письма с кодом подтверждения в очередь отправки"""
+    return OutboxEmail.objects.create(
+        address=address,
+        subject=SUBJECT,
+        body=MESSAGE.format(code=confirmation_code)
+    )
+
+
+def is_disconnect(error):
+    """Обрыв соединения, а не отказ сервера принять письмо"""
+    return isinstance(error, SMTPServerDisconnected) or (
+        isinstance(error, OSError) and not isinstance(error, SMTPException)
+    )
+
+
+def deliver(connection, message):
+    """
+    Отправка письма через долгоживущее соединение. Закрытое
+    соединение открывается, после обрыва письмо отправляется
+    еще раз через новое.
+    """
+    connection.open()
+    try:
+        connection.send_messages([message])
+    except Exception as error:
+        if not is_disconnect(error):
+            raise
+        connection.close()
+        connection.open()
+        connection.send_messages([message])
+
+
+def claim_outbox(batch_size):
+    """
+    Захват пачки писем, готовых к отправке. Попытка засчитывается
+    сразу, а следующая назначается через OUTBOX_CLAIM_TIMEOUT, после
+    чего блокировки снимаются коммитом. Письма упавшего обработчика
+    вернутся в очередь по истечении этого срока.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.PENDING, next_attempt__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        for email in batch:
+            email.attempts += 1
+            email.next_attempt = now + timedelta(
+                seconds=settings.REVIEW['OUTBOX_CLAIM_TIMEOUT']
+            )
+        OutboxEmail.objects.bulk_update(batch, ('attempts', 'next_attempt'))
+    return batch
+
+
+def renew_claim(email):
+    """
+    Продление захвата письма перед отправкой. Другой обработчик,
+    захвативший письмо после истечения срока, увеличил attempts,
+    и тогда письмо пропускается, чтобы не уйти дважды.
+    """
+    next_attempt = timezone.now() + timedelta(
+        seconds=settings.REVIEW['OUTBOX_CLAIM_TIMEOUT']
+    )
+    renewed = OutboxEmail.objects.filter(
+        pk=email.pk, status=OutboxEmail.PENDING, attempts=email.attempts
+    ).update(next_attempt=next_attempt)
+    email.next_attempt = next_attempt
+    return bool(renewed)
+
+
+def send_outbox(connection, batch_size=100):
+    """
+    Отправка пачки писем из очереди через соединение connection.
+    Сеть не задерживает блокировки: письма захватываются отдельной
+    транзакцией, а результат каждого записывается после отправки.
+    Неудачные откладываются с растущей задержкой. Захват продлевается
+    перед каждым письмом, поэтому большая пачка не переживает его срок.
+    Возвращает число обработанных писем.
+    """
+    processed = 0
+    for email in claim_outbox(batch_size):
+        if not renew_claim(email):
+            continue
+        processed += 1
+        try:
+            deliver(connection, EmailMessage(
+                email.subject, email.body,
+                settings.REVIEW['EMAIL_FROM'], [email.address],
+                connection=connection
+            ))
+        except Exception as error:
+            email.last_error = str(error)
+            email.next_attempt = timezone.now() + timedelta(
+                seconds=settings.REVIEW['OUTBOX_RETRY_DELAY']
+                * 2 ** (email.attempts - 1)
+            )
+            if email.attempts >= settings.REVIEW['OUTBOX_MAX_ATTEMPTS']:
+                email.status = OutboxEmail.FAILED
+        else:
+            email.status = OutboxEmail.SENT
+            email.sent = timezone.now()
+        email.save(update_fields=(
+            'status', 'last_error', 'next_attempt', 'sent'
+        ))
+    return processed
+
+
+def rating_expression(rating_sum, rating_count, is_empty):
+    """
+    Округленное среднее оценок по сумме и количеству.
+    Половина округляется вверх, как у Round(Avg(...)).
+    """
+    return Case(
+        When(is_empty, then=Value(None)),
+        default=(2 * rating_sum + rating_count) / (2 * rating_count),
+        output_field=IntegerField()
+    )
+
+
+def update_rating(title_id, score_delta, count_delta=0):
+    """Атомарное изменение счетчиков рейтинга одним UPDATE"""
+    rating_sum = F('rating_sum') + score_delta
+    rating_count = F('rating_count') + count_delta
+    return Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=rating_expression(
+            rating_sum, rating_count, Q(rating_count__lte=-count_delta)
+        )
+    )
+
+
+def rebuild_ratings(titles=None):
+    """Пересчет счетчиков рейтинга для всех или заданных произведений"""
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = (
+        Review.objects.filter(title=OuterRef('pk'))
+        .order_by().values('title')
+    )
+    titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')), 0
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')), 0
+        )
     )
+    return titles.update(rating=rating_expression(
+        F('rating_sum'), F('rating_count'), Q(rating_count=0)
+    ))
@@ -0,0 +1,218 @@
+"""Модуль обработчиков сигналов для сброса кэша и счетчиков"""
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import Signal, receiver
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleFacet, User)
+
+from .authentication import TOKEN_FIELDS, forget_users
+from .autocomplete import KINDS, prefix_index
+from .cache import (AUTOCOMPLETE, RANKING, TITLE_SEARCH, invalidate,
+                    invalidate_ranking, invalidate_title_cards, touch)
+from .facets import apply_changes, snapshot, title_counts
+from .search import index_titles
+
+# пакетные операции над произведениями идут в обход post_save и m2m_changed
+titles_bulk_changed = Signal(providing_args=['ids'])
+
+
+def titles_changed(ids):
+    """Сброс карточек и меток изменения произведений"""
+    ids = list(ids)
+    if ids:
+        invalidate_title_cards(ids)
+        touch('titles', *(f'title:{pk}' for pk in ids))
+
+
+def rubric_titles_changed(titles):
+    """Рейтинг сбрасывается, только если в рубрике есть оцененные"""
+    ratings = dict(titles.values_list('pk', 'rating'))
+    titles_changed(ratings)
+    if any(rating is not None for rating in ratings.values()):
+        invalidate(RANKING)
+
+
+@receiver(titles_bulk_changed)
+def invalidate_bulk_titles(sender, ids, **kwargs):
+    titles_changed(ids)
+    invalidate(RANKING)
+    invalidate(TITLE_SEARCH)
+    invalidate(AUTOCOMPLETE)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_rubrics(sender, **kwargs):
+    invalidate(sender._meta.label_lower)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def invalidate_category_titles(sender, instance, **kwargs):
+    rubric_titles_changed(Title.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def invalidate_genre_titles(sender, instance, **kwargs):
+    rubric_titles_changed(Title.objects.filter(genre=instance))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    titles_changed([instance.pk])
+    # в рейтинг попадают только оцененные произведения
+    if instance.rating is not None:
+        invalidate(RANKING)
+
+
+@receiver(post_save, sender=Title)
+def index_title_name(sender, instance, **kwargs):
+    index_titles([(instance.pk, instance.name)])
+    prefix_index.update([('titles', instance.pk, instance.name, None)])
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title_name(sender, instance, **kwargs):
+    index_titles([(instance.pk, None)])
+    prefix_index.update([('titles', instance.pk, None, None)])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def index_rubric_name(sender, instance, **kwargs):
+    prefix_index.update(
+        [(KINDS[sender], instance.pk, instance.name, instance.slug)]
+    )
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def unindex_rubric_name(sender, instance, **kwargs):
+    prefix_index.update([(KINDS[sender], instance.pk, None, None)])
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_title(sender, instance, **kwargs):
+    titles_changed([instance.title_id])
+    touch(f'reviews:{instance.title_id}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_comments(sender, instance, **kwargs):
+    touch(f'comments:{instance.review_id}')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        titles_changed([instance.pk])
+        if instance.rating is not None:
+            invalidate(RANKING)
+    elif action == 'pre_clear':
+        invalidate_genre_titles(Genre, instance)
+    else:
+        titles_changed(pk_set)
+        invalidate_ranking(pk_set)
+
+
+@receiver(pre_save, sender=Title)
+@receiver(pre_delete, sender=Title)
+def remember_title_facets(sender, instance, **kwargs):
+    instance._facets = snapshot([instance.pk] if instance.pk else [])
+
+
+@receiver(post_save, sender=Title)
+def update_title_facets(sender, instance, created, **kwargs):
+    old = instance.__dict__.pop('_facets')
+    if created:
+        # у нового произведения еще нет жанров
+        new = title_counts(instance.category_id, instance.year)
+    else:
+        new = snapshot([instance.pk])
+    apply_changes(old, new)
+
+
+@receiver(post_delete, sender=Title)
+def discount_title_facets(sender, instance, **kwargs):
+    apply_changes(instance.__dict__.pop('_facets'), snapshot([]))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_genre_facets(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    """Снимок счетчиков до изменения связей и перенос разницы после"""
+    stage, _, operation = action.partition('_')
+    if stage == 'pre':
+        if not reverse:
+            ids = [instance.pk]
+        elif operation == 'clear':
+            ids = list(instance.titles.values_list('pk', flat=True))
+        else:
+            ids = list(pk_set)
+        instance._genre_facets = ids, snapshot(ids)
+    else:
+        ids, old = instance.__dict__.pop('_genre_facets')
+        apply_changes(old, snapshot(ids))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_facets(sender, instance, **kwargs):
+    ids = list(instance.titles.values_list('pk', flat=True))
+    instance._facets = ids, snapshot(ids)
+
+
+@receiver(post_delete, sender=Category)
+def move_category_facets(sender, instance, **kwargs):
+    ids, old = instance.__dict__.pop('_facets')
+    apply_changes(old, snapshot(ids))
+
+
+@receiver(post_delete, sender=Genre)
+def delete_genre_facets(sender, instance, **kwargs):
+    TitleFacet.objects.filter(genre_key=instance.pk).delete()
+
+
+@receiver(pre_save, sender=User)
+def bump_token_version(sender, instance, **kwargs):
+    """
+    Смена роли или флагов отзывает ранее выданные токены.
+    QuerySet.update сигналов не вызывает: массовое изменение этих
+    полей должно само увеличивать token_version и вызывать forget_users.
+    """
+    if instance.pk is None:
+        return
+    old = User.objects.filter(pk=instance.pk).values(*TOKEN_FIELDS).first()
+    instance._renamed = bool(old) and old['username'] != instance.username
+    if old and any(
+        old[field] != getattr(instance, field) for field in TOKEN_FIELDS
+    ):
+        instance.token_version += 1
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """
+    Сброс пользователя и списков, в которые встроено его имя.
+    При удалении отзывы и комментарии удаляются каскадом
+    и сами обновляют метки своих списков.
+    """
+    forget_users([instance.pk])
+    if instance.__dict__.pop('_renamed', False):
+        touch(
+            *(f'reviews:{pk}' for pk in Review.objects.filter(
+                author=instance
+            ).values_list('title_id', flat=True).distinct()),
+            *(f'comments:{pk}' for pk in Comment.objects.filter(
+                author=instance
+            ).values_list('review_id', flat=True).distinct())
+        )
@@ -2,7 +2,8 @@ from django.urls import include, path
 from rest_framework import routers
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, signup, token)
+                    ReviewViewSet, TitleViewSet, UserViewSet, autocomplete,
+                    export, signup, token)
 
 app_name = 'api'
 
@@ -28,6 +29,8 @@ auths = [
 ]
 
 urlpatterns = [
+    path('v1/export/', export),
+    path('v1/autocomplete/', autocomplete),
     path('v1/', include(router_v1.urls)),
     path('v1/auth/', include(auths))
 ]
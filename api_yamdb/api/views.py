@@ -1,28 +1,47 @@
-from django.db import IntegrityError
-from django.db.models import Avg
-from django.db.models.functions import Round
-from django.http import HttpResponseBadRequest
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, viewsets
+from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.exceptions import MethodNotAllowed
-from rest_framework.permissions import (AllowAny, IsAuthenticated,
+from rest_framework.exceptions import (MethodNotAllowed, NotFound,
+                                       ValidationError)
+from rest_framework.permissions import (SAFE_METHODS, AllowAny,
+                                        IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import Category, Comment, Genre, Review, Title, User
 
+from .authentication import get_access_token, get_cached_user, user_reference
+from .autocomplete import SOURCES, prefix_index
+from .cache import (get_ranking, get_title_cards, rerank_title, touch,
+                    versioned_key)
+from .conditional import ConditionalGetMixin
+from .export import export_catalog
+from .facets import get_facets, get_live_facets
 from .filters import TitleFilter
-from .permissions import (IsAdminAsDefinedByUserModel,
+from .pagination import BaseInfoPagination, TitlePagination
+from .permissions import (IsAdminAsDefinedByUserModel, IsAdminOrModerator,
                           IsAdminOrModeratorOrAuthorOrReadOnly,
                           IsAdminUserOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
+from .readers import (CommentRowSerializer, ReviewRowSerializer,
+                      TitleRowSerializer)
+from .search import TRUNCATED_HEADER, search_ordering
+from .serializers import (BulkDeleteSerializer, CategorySerializer,
+                          CommentModerationSerializer, CommentSerializer,
                           CurrentUserSerializer, GenreSerializer,
-                          ReadTitleSerializer, ReviewSerializer,
-                          SignUpSerializer, TokenRequestSerializer,
-                          UserSerializer, WriteTitleSerializer)
-from .services import confirmation_email, generate_confirmation_code
+                          ReadTitleSerializer, ReviewModerationSerializer,
+                          ReviewSerializer, SignUpSerializer,
+                          TokenRequestSerializer, UserSerializer,
+                          WriteTitleSerializer)
+from .services import (confirmation_email, generate_confirmation_code,
+                       rebuild_ratings, update_rating)
+from .signals import titles_bulk_changed
 
 
 class RubricBaseViewSet(
@@ -36,44 +55,241 @@ class RubricBaseViewSet(
     search_fields = ('name',)
     lookup_field = 'slug'
 
+    def list(self, request, *args, **kwargs):
+        """
+        Список рубрик по поисковому запросу хранится в кэше целиком,
+        страницы и ссылки на соседние строятся для каждого запроса.
+        Ключ зависит только от набора слов поиска: номер страницы,
+        хост и посторонние параметры не порождают новых ключей.
+        """
+        terms = filters.SearchFilter().get_search_terms(request)
+        key = versioned_key(
+            self.queryset.model._meta.label_lower,
+            md5('\0'.join(sorted(set(terms))).encode()).hexdigest()
+        )
+        data = cache.get(key)
+        if data is None:
+            data = self.get_serializer(
+                self.filter_queryset(self.get_queryset()), many=True
+            ).data
+            cache.set(key, data, settings.REVIEW['CATALOG_CACHE_TIMEOUT'])
+        page = self.paginate_queryset(data)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(page)
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    serializer_class = ReviewSerializer
+def validate_bulk_data(data):
+    if not isinstance(data, list):
+        raise ValidationError('Ожидается список объектов')
+    if len(data) > settings.REVIEW['BULK_MAX_ITEMS']:
+        raise ValidationError(
+            f'Не больше {settings.REVIEW["BULK_MAX_ITEMS"]} объектов за раз'
+        )
+
+
+def get_limit(request, default, maximum):
+    """Число элементов ответа из параметра limit"""
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except ValueError:
+        raise ValidationError({'limit': ['Введите целое число.']})
+    if not 0 < limit <= maximum:
+        raise ValidationError({'limit': [f'Допустимо от 1 до {maximum}.']})
+    return limit
+
+
+def mark_truncated(request, response):
+    """Заголовок о том, что совпадения поиска по названию усечены"""
+    if getattr(request, 'search_truncated', False):
+        response[TRUNCATED_HEADER] = str(
+            settings.REVIEW['SEARCH_MAX_RESULTS']
+        )
+    return response
+
+
+def get_bulk_instances(queryset, data):
+    """Объекты для пакетного изменения в порядке элементов запроса"""
+    validate_bulk_data(data)
+    ids = [
+        item.get('id') if isinstance(item, dict) else None for item in data
+    ]
+    # true и false из JSON — тоже int, но не id
+    ids = [
+        pk if isinstance(pk, int) and not isinstance(pk, bool) else None
+        for pk in ids
+    ]
+    found = queryset.in_bulk([pk for pk in ids if pk is not None])
+    errors = [
+        {} if pk in found else {'id': ['Объект не найден']} for pk in ids
+    ]
+    if any(errors):
+        raise ValidationError(errors)
+    return [found[pk] for pk in ids]
+
+
+class BaseInfoViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    """
+    Базовый набор для отзывов и комментариев.
+    Родитель загружается только при создании записи и для пустой
+    страницы, чтобы отличить пустой список от неверного адреса.
+    Наследники задают parent_model и parent_lookups — соответствие
+    полей родителя аргументам адреса.
+    """
     permission_classes = (
         IsAuthenticatedOrReadOnly, IsAdminOrModeratorOrAuthorOrReadOnly
     )
+    pagination_class = BaseInfoPagination
+    row_serializer_class = None
+    parent_model = None
+    parent_lookups = {}
 
-    def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+    def get_parent_or_404(self):
+        return get_object_or_404(
+            self.parent_model.objects.only('id'),
+            **{
+                field: self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookups.items()
+            }
+        )
+
+    @cached_property
+    def parent(self):
+        return self.get_parent_or_404()
+
+    def list(self, request, *args, **kwargs):
+        """Список из кортежей values_list, если задан row_serializer_class"""
+        if self.row_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        rows = self.row_serializer_class.rows(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(self.row_serializer_class.serialize(rows))
+        return self.get_paginated_response(
+            self.row_serializer_class.serialize(page)
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_parent_or_404()
+        return page
+
+    def perform_bulk_change(self):
+        """Действия после пакетного изменения или удаления"""
+
+    @action(
+        methods=['PATCH', 'DELETE'], detail=False, url_path='bulk',
+        permission_classes=(IsAdminOrModerator,)
+    )
+    @transaction.atomic
+    def bulk(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        if request.method == 'DELETE':
+            serializer = BulkDeleteSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            ids = set(serializer.validated_data['ids'])
+            queryset = queryset.filter(pk__in=ids)
+            missing = ids.difference(
+                queryset.select_for_update().values_list('pk', flat=True)
+            )
+            if missing:
+                raise NotFound({'ids': [
+                    f'Объекты не найдены: {sorted(missing)}'
+                ]})
+            queryset.delete()
+            self.perform_bulk_change()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        serializer = self.bulk_serializer_class(
+            get_bulk_instances(queryset, request.data),
+            data=request.data, many=True, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        instances = serializer.save()
+        self.perform_bulk_change()
+        return Response(
+            self.get_serializer(instances, many=True).data
+        )
+
+
+class ReviewViewSet(BaseInfoViewSet):
+    serializer_class = ReviewSerializer
+    bulk_serializer_class = ReviewModerationSerializer
+    row_serializer_class = ReviewRowSerializer
+    parent_model = Title
+    parent_lookups = {'id': 'title_id'}
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author')
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user,
-            title=self.get_title()
+        review = serializer.save(
+            author=user_reference(self.request.user),
+            title=self.parent
         )
+        update_rating(review.title_id, review.score, 1)
+        rerank_title(review.title_id)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_score = Review.objects.select_for_update().values_list(
+            'score', flat=True
+        ).get(pk=serializer.instance.pk)
+        review = serializer.save()
+        update_rating(review.title_id, review.score - old_score)
+        rerank_title(review.title_id)
 
-class CommentViewSet(viewsets.ModelViewSet):
-    serializer_class = CommentSerializer
-    permission_classes = (
-        IsAuthenticatedOrReadOnly, IsAdminOrModeratorOrAuthorOrReadOnly
-    )
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        score = Review.objects.select_for_update().values_list(
+            'score', flat=True
+        ).filter(pk=instance.pk).first()
+        if score is None:
+            return
+        instance.delete()
+        update_rating(instance.title_id, -score, -1)
+        rerank_title(instance.title_id)
 
-    def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+    def get_stamp_names(self):
+        return (f'reviews:{self.kwargs.get("title_id")}',)
+
+    def perform_bulk_change(self):
+        title_id = self.kwargs.get('title_id')
+        rebuild_ratings(Title.objects.filter(pk=title_id))
+        titles_bulk_changed.send(sender=Title, ids=[int(title_id)])
+        touch(f'reviews:{title_id}')
+
+
+class CommentViewSet(BaseInfoViewSet):
+    serializer_class = CommentSerializer
+    bulk_serializer_class = CommentModerationSerializer
+    row_serializer_class = CommentRowSerializer
+    parent_model = Review
+    parent_lookups = {'id': 'review_id', 'title_id': 'title_id'}
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        ).select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(
-            author=self.request.user,
-            review=self.get_review()
+            author=user_reference(self.request.user),
+            review=self.parent
         )
 
+    def get_stamp_names(self):
+        return (f'comments:{self.kwargs.get("review_id")}',)
+
+    def perform_bulk_change(self):
+        touch(f'comments:{self.kwargs.get("review_id")}')
+
 
 class CategoryViewSet(RubricBaseViewSet):
     queryset = Category.objects.all()
@@ -85,21 +301,123 @@ class GenreViewSet(RubricBaseViewSet):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = (
-        Title.objects.annotate(rating=Round(Avg('reviews__score')))
+        Title.objects.select_related('category').prefetch_related('genre')
     )
-    ordering = ('name',)
     serializer_class = WriteTitleSerializer
     permission_classes = (IsAdminUserOrReadOnly,)
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitleFilter
+    pagination_class = TitlePagination
+    ordering_fields = ('name', 'year', 'rating', 'id')
+    conditional_actions = ('list', 'retrieve', 'facets', 'top')
+    row_serializer_class = TitleRowSerializer
+
+    @property
+    def ordering(self):
+        """По названию, а при поиске — от наиболее похожих названий"""
+        request = getattr(self, 'request', None)
+        query = request.query_params.get('name') if request else None
+        if query:
+            return search_ordering(self.queryset, query)
+        return ('name',)
+
+    def get_stamp_names(self):
+        if self.action == 'retrieve':
+            return (f'title:{self.kwargs.get(self.lookup_field)}',)
+        return ('titles',)
 
     def get_serializer_class(self):
-        if self.action in ['create', 'update', 'partial_update']:
+        if self.action in ['create', 'update', 'partial_update', 'bulk']:
             return WriteTitleSerializer
         return ReadTitleSerializer
 
+    def get_cards(self, ids):
+        return get_title_cards(ids, self.row_serializer_class)
+
+    @action(methods=['POST', 'PATCH'], detail=False, url_path='bulk')
+    @transaction.atomic
+    def bulk(self, request):
+        """Пакетное создание или изменение произведений"""
+        partial = request.method == 'PATCH'
+        instances = None
+        if partial:
+            instances = get_bulk_instances(Title.objects.all(), request.data)
+        else:
+            validate_bulk_data(request.data)
+        serializer = self.get_serializer(
+            instances, data=request.data, many=True, partial=partial
+        )
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+        titles_bulk_changed.send(
+            sender=Title, ids=[title.pk for title in titles]
+        )
+        return Response(
+            serializer.data,
+            status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED
+        )
+
+    @action(methods=['GET'], detail=False)
+    def facets(self, request):
+        """
+        Число произведений по жанрам, категориям и годам при текущих
+        фильтрах. Без фильтра по названию читается из таблицы счетчиков.
+        """
+        params = {
+            key: request.query_params[key]
+            for key in self.filterset_class.Meta.fields
+            if request.query_params.get(key)
+        }
+        if 'year' in params:
+            try:
+                params['year'] = int(params['year'])
+            except ValueError:
+                raise ValidationError({'year': ['Введите целое число.']})
+        if 'name' in params:
+            return mark_truncated(request, Response(get_live_facets(
+                Title.objects.all(), self.filterset_class, params, request
+            )))
+        return Response(get_facets(
+            params.get('genre'), params.get('category'), params.get('year')
+        ))
+
+    @action(methods=['GET'], detail=False)
+    def top(self, request):
+        """Произведения с наибольшим рейтингом, в жанре или категории"""
+        limit = get_limit(
+            request, settings.REVIEW['TOP_SIZE'],
+            settings.REVIEW['TOP_MAX_SIZE']
+        )
+        ids = get_ranking(
+            request.query_params.get('genre'),
+            request.query_params.get('category')
+        )
+        return Response(self.get_cards(ids[:limit]))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(
+            self.get_queryset().prefetch_related(None)
+        ).values_list('pk', flat=True)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return mark_truncated(
+                request, Response(self.get_cards(list(queryset)))
+            )
+        return mark_truncated(
+            request, self.get_paginated_response(self.get_cards(page))
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            cards = self.get_cards([int(kwargs[self.lookup_field])])
+        except ValueError:
+            raise Http404
+        if not cards:
+            raise Http404
+        return Response(cards[0])
+
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('-date_joined')
@@ -107,12 +425,20 @@ class UserViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAdminAsDefinedByUserModel,)
     lookup_field = 'username'
     filter_backends = (filters.SearchFilter,)
-    search_fields = ('username',)
+    # поиск по началу без учета регистра идет по индексам
+    # из миграции reviews.0009_user_search_indexes
+    search_fields = ('^username', '^email')
 
     def get_object(self):
-        if self.action == 'me':
-            return self.request.user
-        return super().get_object()
+        if self.action != 'me':
+            return super().get_object()
+        if self.request.method in SAFE_METHODS:
+            user = get_cached_user(self.request.user.pk)
+        else:
+            user = User.objects.filter(pk=self.request.user.pk).first()
+        if user is None:
+            raise Http404
+        return user
 
     @action(
         methods=['GET', 'PATCH'], detail=False,
@@ -162,4 +488,29 @@ def token(request):
         return HttpResponseBadRequest('Неверный код подтверждения')
     user.is_active = True
     user.save()
-    return Response({'token': str(RefreshToken.for_user(user).access_token)})
+    return Response({'token': str(get_access_token(user))})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminAsDefinedByUserModel])
+def export(request):
+    """Потоковая выгрузка каталога с отзывами в формате NDJSON"""
+    response = StreamingHttpResponse(
+        export_catalog(), content_type='application/x-ndjson'
+    )
+    response['Content-Disposition'] = 'attachment; filename="catalog.ndjson"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def autocomplete(request):
+    """Подсказки по началу слов в названиях из индекса в памяти"""
+    limit = get_limit(
+        request, settings.REVIEW['AUTOCOMPLETE_SIZE'],
+        settings.REVIEW['AUTOCOMPLETE_MAX_SIZE']
+    )
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({kind: [] for kind in SOURCES})
+    return Response(prefix_index.search(query, limit))
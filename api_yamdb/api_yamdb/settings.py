@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -25,6 +26,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,6 +69,13 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -93,10 +102,23 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAdminUser',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    # orjson при наличии, иначе стандартный json;
+    # MessagePack по Accept: application/msgpack, если установлен msgpack
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        *(['api.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        *(['api.parsers.MessagePackParser'] if find_spec('msgpack') else []),
+    ],
 }
 
 SIMPLE_JWT = {
@@ -128,5 +150,35 @@ REVIEW = {
     'CODE_LENGTH': 20,
     'EMAIL_FROM': 'info@example.com',
     'LENGTH_LIMIT': 15,
-    'RESERVED_USERNAMES': ('me',)
+    'RESERVED_USERNAMES': ('me',),
+    'CATALOG_CACHE_TIMEOUT': 60 * 60,
+    'MAX_PAGE_SIZE': 100,
+    'TOP_SIZE': 10,
+    'TOP_MAX_SIZE': 100,
+    # совпадений поиска по индексу в памяти (не PostgreSQL); при
+    # усечении ответ получает заголовок X-Search-Truncated
+    'SEARCH_MAX_RESULTS': 500,
+    # журнал изменений индексов в памяти: срок хранения и отставание,
+    # после которого индекс перестраивается целиком
+    'INDEX_CHANGES_TIMEOUT': 60 * 60,
+    'INDEX_CHANGES_MAX': 1000,
+    'AUTOCOMPLETE_SIZE': 10,
+    'AUTOCOMPLETE_MAX_SIZE': 50,
+    'TITLE_COUNT_MODE': 'exact',
+    'BULK_MAX_ITEMS': 500,
+    'OUTBOX_BATCH_SIZE': 100,
+    'OUTBOX_MAX_ATTEMPTS': 5,
+    'OUTBOX_RETRY_DELAY': 60,
+    # срок, на который обработчик захватывает письма перед отправкой
+    'OUTBOX_CLAIM_TIMEOUT': 5 * 60,
+    'USER_CACHE_TIMEOUT': 60,
+    # версия токенов живет в кэше несколько секунд: с кэшем в памяти
+    # процесса отзыв доходит до остальных воркеров не позже этого срока
+    'TOKEN_VERSION_TIMEOUT': 5,
+    'METRICS_BUCKETS': (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+    ),
+    # токен сборщика метрик; без него /metrics закрыт
+    'METRICS_TOKEN': os.getenv('METRICS_TOKEN', default=''),
+    'SERVER_TIMING': os.getenv('SERVER_TIMING', default='') == 'true',
 }
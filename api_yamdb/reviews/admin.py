@@ -1,3 +1,4 @@
+from api.services import rebuild_ratings
 from django import forms
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
@@ -65,7 +66,8 @@ class TitleAdmin(admin.ModelAdmin):
         'name',
         'year',
         'category',
-        'get_genre'
+        'get_genre',
+        'rating'
     )
     search_fields = ('name',)
     list_editable = ('category',)
@@ -88,6 +90,22 @@ class ReviewAdmin(admin.ModelAdmin):
     )
     search_fields = ('title__name',)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        titles = {obj.title_id, form.initial.get('title')}
+        rebuild_ratings(Title.objects.filter(pk__in=titles - {None}))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        rebuild_ratings(Title.objects.filter(pk=obj.title_id))
+
+    def delete_queryset(self, request, queryset):
+        titles = Title.objects.filter(
+            pk__in=set(queryset.values_list('title_id', flat=True))
+        )
+        super().delete_queryset(request, queryset)
+        rebuild_ratings(titles)
+
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
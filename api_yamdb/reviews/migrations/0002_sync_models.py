@@ -0,0 +1,112 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:11
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'default_related_name': 'categories', 'ordering': ('name',), 'verbose_name': 'категория', 'verbose_name_plural': 'категории'},
+        ),
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'default_related_name': 'comments', 'ordering': ('-pub_date',), 'verbose_name': 'комментарий', 'verbose_name_plural': 'комментарии'},
+        ),
+        migrations.AlterModelOptions(
+            name='genre',
+            options={'default_related_name': 'genres', 'ordering': ('name',), 'verbose_name': 'жанр', 'verbose_name_plural': 'жанры'},
+        ),
+        migrations.AlterModelOptions(
+            name='review',
+            options={'default_related_name': 'reviews', 'ordering': ('-pub_date',), 'verbose_name': 'отзыв', 'verbose_name_plural': 'отзывы'},
+        ),
+        migrations.RemoveField(
+            model_name='yamdbuser',
+            name='is_moderator',
+        ),
+        migrations.AddField(
+            model_name='yamdbuser',
+            name='role',
+            field=models.CharField(choices=[('user', 'пользователь'), ('admin', 'админ'), ('moderator', 'модератор')], default='user', max_length=9, verbose_name='роль'),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='name',
+            field=models.CharField(max_length=256, verbose_name='название'),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(unique=True, verbose_name='код'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='author',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='comments', to=settings.AUTH_USER_MODEL, verbose_name='автор'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='text',
+            field=models.TextField(verbose_name='текст'),
+        ),
+        migrations.AlterField(
+            model_name='genre',
+            name='name',
+            field=models.CharField(max_length=256, verbose_name='название'),
+        ),
+        migrations.AlterField(
+            model_name='genre',
+            name='slug',
+            field=models.SlugField(unique=True, verbose_name='код'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='author',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviews', to=settings.AUTH_USER_MODEL, verbose_name='автор'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='score',
+            field=models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1, message='Не меньше 1'), django.core.validators.MaxValueValidator(10, message='Не больше 10')], verbose_name='оценка'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='text',
+            field=models.TextField(verbose_name='текст'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='name',
+            field=models.TextField(verbose_name='название'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.SmallIntegerField(validators=[django.core.validators.MaxValueValidator(reviews.validators.this_year, message='Год выпуска не может быть больше текущего!')], verbose_name='год выпуска'),
+        ),
+        migrations.AlterField(
+            model_name='yamdbuser',
+            name='first_name',
+            field=models.CharField(blank=True, max_length=150, null=True, verbose_name='имя'),
+        ),
+        migrations.AlterField(
+            model_name='yamdbuser',
+            name='last_name',
+            field=models.CharField(blank=True, max_length=150, null=True, verbose_name='фамилия'),
+        ),
+        migrations.AlterField(
+            model_name='yamdbuser',
+            name='username',
+            field=models.CharField(max_length=150, unique=True, validators=[django.core.validators.RegexValidator(message='Допускаются буквы, цифры и знаки _ @ / + - .', regex='^[\\w.@+-]+$')], verbose_name='имя пользователя'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_title_facets(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleFacet = apps.get_model('reviews', 'TitleFacet')
+    facets = [
+        TitleFacet(
+            genre_key=0, category_key=row['category_id'] or 0,
+            year=row['year'], count=row['total']
+        )
+        for row in Title.objects.order_by().values('category_id', 'year')
+        .annotate(total=Count('pk'))
+    ]
+    facets.extend(
+        TitleFacet(
+            genre_key=row['genre_id'],
+            category_key=row['title__category_id'] or 0,
+            year=row['title__year'], count=row['total']
+        )
+        for row in Title.genre.through.objects.order_by()
+        .values('genre_id', 'title__category_id', 'title__year')
+        .annotate(total=Count('pk'))
+    )
+    TitleFacet.objects.bulk_create(facets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleFacet',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre_key', models.PositiveIntegerField(verbose_name='жанр')),
+                ('category_key', models.PositiveIntegerField(verbose_name='категория')),
+                ('year', models.SmallIntegerField(verbose_name='год выпуска')),
+                ('count', models.IntegerField(default=0, verbose_name='произведений')),
+            ],
+            options={
+                'verbose_name': 'счетчик фильтра',
+                'verbose_name_plural': 'счетчики фильтров',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlefacet',
+            constraint=models.UniqueConstraint(fields=('genre_key', 'category_key', 'year'), name='unique_title_facet'),
+        ),
+        migrations.RunPython(fill_title_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+PREFIX_FIELDS = ('username', 'email')
+
+
+def create_prefix_indexes(apps, schema_editor):
+    """
+    Индексы для istartswith. На PostgreSQL сравнивается
+    UPPER(поле::text) LIKE, на SQLite — LIKE без учета регистра,
+    который использует только индекс с NOCASE.
+    """
+    vendor = schema_editor.connection.vendor
+    for field in PREFIX_FIELDS:
+        if vendor == 'postgresql':
+            expression = f'UPPER({field}::text) text_pattern_ops'
+        elif vendor == 'sqlite':
+            expression = f'{field} COLLATE NOCASE'
+        else:
+            continue
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS user_{field}_prefix_idx '
+            f'ON reviews_yamdbuser ({expression})'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor not in ('postgresql', 'sqlite'):
+        return
+    for field in PREFIX_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS user_{field}_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='yamdbuser',
+            index=models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ),
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -54,6 +54,18 @@ class YamdbUser(AbstractUser):
         default=USER
     )
     code = models.CharField(max_length=20, null=True, blank=True)
+    token_version = models.PositiveIntegerField(
+        'версия токенов',
+        default=0,
+        editable=False
+    )
+
+    class Meta(AbstractUser.Meta):
+        # индексы UPPER(username), UPPER(email) для поиска по началу
+        # создаются в миграции 0009_user_search_indexes
+        indexes = [
+            models.Index(fields=['date_joined'], name='user_date_joined_idx')
+        ]
 
     @property
     def is_admin(self):
@@ -86,6 +98,9 @@ class Category(RubricBase):
 
     class Meta(RubricBase.Meta):
         default_related_name = 'categories'
+        indexes = [
+            models.Index(fields=['name'], name='category_name_idx')
+        ]
         verbose_name = 'категория'
         verbose_name_plural = 'категории'
 
@@ -94,6 +109,9 @@ class Genre(RubricBase):
 
     class Meta(RubricBase.Meta):
         default_related_name = 'genres'
+        indexes = [
+            models.Index(fields=['name'], name='genre_name_idx')
+        ]
         verbose_name = 'жанр'
         verbose_name_plural = 'жанры'
 
@@ -123,9 +141,41 @@ class Title(PrintFieldMixin, models.Model):
         null=True,
         verbose_name='категория'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='количество оценок'
+    )
+    rating = models.PositiveSmallIntegerField(
+        null=True,
+        editable=False,
+        db_index=True,
+        verbose_name='рейтинг'
+    )
 
     class Meta:
         default_related_name = 'titles'
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_idx'),
+            models.Index(fields=['year', 'id'], name='title_year_idx'),
+            models.Index(
+                fields=['category', 'name', 'id'],
+                name='title_category_name_idx'
+            ),
+            models.Index(
+                fields=['-rating', '-rating_count', 'id'],
+                name='title_rating_rank_idx'
+            ),
+            models.Index(
+                fields=['category', '-rating', '-rating_count', 'id'],
+                name='title_category_rank_idx'
+            )
+        ]
         verbose_name = 'произведение'
         verbose_name_plural = 'произведения'
         # ordering = ('name',) # не работает с версии 3.1 при annotate
@@ -147,7 +197,7 @@ class BaseInfo(PrintFieldMixin, models.Model):
 
     class Meta:
         abstract = True
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
 
     # def __str__(self):
     #     return self.text[:settings.REVIEW['LENGTH_LIMIT']]
@@ -174,6 +224,12 @@ class Review(BaseInfo):
                 fields=['title', 'author'],
                 name='unique_review'
             )]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            )
+        ]
         verbose_name = 'отзыв'
         verbose_name_plural = 'отзывы'
 
@@ -187,5 +243,35 @@ class Comment(BaseInfo):
 
     class Meta(BaseInfo.Meta):
         default_related_name = 'comments'
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
+
+
+class TitleFacet(models.Model):
+    """
+    Число произведений с заданными жанром, категорией и годом.
+    genre_key = 0 — все произведения независимо от жанров,
+    category_key = 0 — произведения без категории.
+    """
+    ANY_GENRE = 0
+    NO_CATEGORY = 0
+
+    genre_key = models.PositiveIntegerField(verbose_name='жанр')
+    category_key = models.PositiveIntegerField(verbose_name='категория')
+    year = models.SmallIntegerField(verbose_name='год выпуска')
+    count = models.IntegerField(default=0, verbose_name='произведений')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['genre_key', 'category_key', 'year'],
+                name='unique_title_facet'
+            )]
+        verbose_name = 'счетчик фильтра'
+        verbose_name_plural = 'счетчики фильтров'
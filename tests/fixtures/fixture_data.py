@@ -0,0 +1,81 @@
+import pytest
+from rest_framework.test import APIClient
+
+TITLES_COUNT = 12
+GENRES_PER_TITLE = 3
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create(
+        username='TestAdmin', email='admin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def catalog(db):
+    from reviews.models import Category, Genre, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(4)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(6)
+    ]
+    titles = []
+    for i in range(TITLES_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=2000 + i % 3,
+            category=categories[i % len(categories)]
+        )
+        title.genre.set(
+            genres[(i + j) % len(genres)] for j in range(GENRES_PER_TITLE)
+        )
+        titles.append(title)
+    return titles
+
+
+@pytest.fixture
+def reviews(catalog, django_user_model):
+    from reviews.models import Comment, Review
+
+    authors = [
+        django_user_model.objects.create(
+            username=f'author{i}', email=f'author{i}@yamdb.fake'
+        )
+        for i in range(8)
+    ]
+    title = catalog[0]
+    result = []
+    for i, author in enumerate(authors):
+        review = Review.objects.create(
+            title=title, author=author, text=f'Отзыв {i}', score=i + 1
+        )
+        for commenter in authors:
+            Comment.objects.create(
+                review=review, author=commenter, text=f'Комментарий {i}'
+            )
+        result.append(review)
+    return result
@@ -0,0 +1,91 @@
+"""
+Наибольшее число запросов к базе для каждого маршрута и действия
+api/urls.py при пустом кэше, включая проверку версии JWT.
+Ключи совпадают с метками метрик: (представление, действие viewset
+или HTTP-метод).
+"""
+from contextlib import ExitStack, contextmanager
+
+BUDGETS = {
+    ('APIRootView', 'get'): 1,
+    ('UserViewSet', 'list'): 3,
+    ('UserViewSet', 'create'): 4,
+    ('UserViewSet', 'retrieve'): 2,
+    ('UserViewSet', 'update'): 8,
+    ('UserViewSet', 'partial_update'): 4,
+    ('UserViewSet', 'destroy'): 10,
+    ('UserViewSet', 'me'): 4,
+    ('CategoryViewSet', 'list'): 3,
+    ('CategoryViewSet', 'create'): 4,
+    ('CategoryViewSet', 'destroy'): 16,
+    ('GenreViewSet', 'list'): 3,
+    ('GenreViewSet', 'create'): 4,
+    ('GenreViewSet', 'destroy'): 7,
+    ('TitleViewSet', 'list'): 5,
+    ('TitleViewSet', 'create'): 20,
+    ('TitleViewSet', 'retrieve'): 3,
+    ('TitleViewSet', 'update'): 17,
+    ('TitleViewSet', 'partial_update'): 29,
+    ('TitleViewSet', 'destroy'): 14,
+    ('TitleViewSet', 'bulk'): 20,
+    ('TitleViewSet', 'facets'): 7,
+    ('TitleViewSet', 'top'): 4,
+    ('ReviewViewSet', 'list'): 3,
+    ('ReviewViewSet', 'create'): 8,
+    ('ReviewViewSet', 'retrieve'): 2,
+    ('ReviewViewSet', 'update'): 9,
+    ('ReviewViewSet', 'partial_update'): 10,
+    ('ReviewViewSet', 'destroy'): 10,
+    ('ReviewViewSet', 'bulk'): 10,
+    ('CommentViewSet', 'list'): 3,
+    ('CommentViewSet', 'create'): 3,
+    ('CommentViewSet', 'retrieve'): 2,
+    ('CommentViewSet', 'update'): 3,
+    ('CommentViewSet', 'partial_update'): 3,
+    ('CommentViewSet', 'destroy'): 3,
+    ('CommentViewSet', 'bulk'): 6,
+    ('signup', 'post'): 8,
+    ('token', 'post'): 4,
+    # снимок выгрузки: SAVEPOINT и RELEASE в тестовой транзакции
+    ('export', 'get'): 8,
+    ('autocomplete', 'get'): 4,
+}
+
+
+def route_labels():
+    """Метки всех маршрутов и действий api/urls.py"""
+    from api.metrics import view_label
+    from api.urls import urlpatterns
+
+    labels = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if hasattr(pattern, 'url_patterns'):
+                walk(pattern.url_patterns)
+                continue
+            callback = pattern.callback
+            methods = getattr(callback, 'actions', None) or [
+                method for method in callback.cls.http_method_names
+                if method not in ('head', 'options')
+                and hasattr(callback.cls, method)
+            ]
+            labels.update(view_label(callback, method) for method in methods)
+
+    walk(urlpatterns)
+    return labels
+
+
+@contextmanager
+def count_queries():
+    """Запросы ко всем базам при пустом кэше: stats.queries"""
+    from api.metrics import RequestStats
+    from django.core.cache import cache
+    from django.db import connections
+
+    stats = RequestStats()
+    cache.clear()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        yield stats
@@ -0,0 +1,75 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestAutocomplete:
+    """Подсказки по началу слов в названиях"""
+
+    url = '/api/v1/autocomplete/'
+
+    def suggest(self, client, query, **params):
+        response = client.get(self.url, {'q': query, **params})
+        assert response.status_code == 200
+        return response.json()
+
+    def test_prefix_matches(self, api_client, catalog):
+        from reviews.models import Title
+
+        Title.objects.create(name='Война и мир', year=1869)
+        data = self.suggest(api_client, 'жанр 1')
+        assert data['genres'] == [{'name': 'Жанр 1', 'slug': 'genre-1'}]
+        assert data['titles'] == [] and data['categories'] == []
+        names = [
+            item['name']
+            for item in self.suggest(api_client, 'произв', limit=3)['titles']
+        ]
+        assert names == ['Произведение 0', 'Произведение 1',
+                         'Произведение 10'], (
+            'Подсказки идут по алфавиту и ограничены limit'
+        )
+        assert [item['name'] for item in self.suggest(
+            api_client, 'МИР'
+        )['titles']] == ['Война и мир'], 'Ищется начало любого слова'
+        assert self.suggest(api_client, ' ') == {
+            'titles': [], 'genres': [], 'categories': []
+        }
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_follows_writes(self, api_client, catalog):
+        from api.autocomplete import prefix_index
+        from reviews.models import Category
+
+        assert self.suggest(api_client, 'комедия')['categories'] == []
+        version = prefix_index.version
+        category = Category.objects.create(name='Комедия', slug='comedy')
+        assert self.suggest(api_client, 'комедия')['categories'] == [
+            {'name': 'Комедия', 'slug': 'comedy'}
+        ]
+        category.name = 'Драма'
+        category.save()
+        catalog[0].delete()
+        data = self.suggest(api_client, 'драма')
+        assert data['categories'] == [{'name': 'Драма', 'slug': 'comedy'}]
+        assert self.suggest(api_client, 'комедия')['categories'] == []
+        assert 'Произведение 0' not in [
+            item['name'] for item in self.suggest(
+                api_client, 'произведение 0'
+            )['titles']
+        ]
+        assert prefix_index.version != version
+
+    def test_prefix_list(self):
+        from api.autocomplete import PrefixList
+
+        prefixes = PrefixList()
+        prefixes.load([(1, 'Альфа бета', 'a'), (2, 'Бета', 'b')])
+        prefixes.add(3, 'Бетон', 'c')
+        assert prefixes.search('бет', 10) == ['a', 'b', 'c']
+        prefixes.discard(1)
+        assert prefixes.search('бет', 10) == ['b', 'c']
+        assert prefixes.keys == sorted(prefixes.keys)
+
+    @pytest.mark.parametrize('limit', ('0', '51', 'abc'))
+    def test_invalid_limit(self, api_client, limit):
+        response = api_client.get(self.url, {'q': 'а', 'limit': limit})
+        assert response.status_code == 400
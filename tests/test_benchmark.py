@@ -0,0 +1,74 @@
+import pytest
+
+COUNTS = {
+    'users': 5, 'categories': 2, 'genres': 4,
+    'titles': 10, 'reviews': 20, 'comments': 30,
+}
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+    """Генерация данных и прогон сценариев нагрузочного теста"""
+
+    def test_generator_is_deterministic(self):
+        from api.datagen import DataGenerator
+        from reviews.models import Category, Genre, Review, Title, User
+
+        def generated():
+            DataGenerator(COUNTS, seed=1).generate()
+            data = (
+                list(Title.objects.order_by('pk').values_list(
+                    'year', 'category_id', 'rating'
+                )),
+                list(Title.genre.through.objects.order_by(
+                    'title_id', 'genre_id'
+                ).values_list('title_id', 'genre_id')),
+                list(Review.objects.order_by('pk').values_list(
+                    'title_id', 'author_id', 'score'
+                )),
+            )
+            for model in (Title, Category, Genre, User):
+                model.objects.all().delete()
+            return data
+
+        first = generated()
+        assert len(first[0]) == COUNTS['titles']
+        assert len(first[2]) == COUNTS['reviews']
+        assert any(rating is not None for _, _, rating in first[0]), (
+            'После генерации рейтинги пересчитываются'
+        )
+        assert generated() == first, 'Одинаковый seed дает одинаковые данные'
+
+    def test_scenarios_report_metrics(self):
+        from api.benchmark import SCENARIOS, Benchmark
+        from api.datagen import DataGenerator
+
+        DataGenerator(COUNTS).generate()
+        results = Benchmark(requests=3).run()
+        assert list(results) == list(SCENARIOS)
+        for name, result in results.items():
+            assert set(result) == {'rps', 'p50', 'p99', 'queries'}, name
+            assert result['rps'] > 0 and result['p99'] >= result['p50']
+
+    def test_compare_with_baseline(self):
+        from api.benchmark import compare
+
+        baseline = {'title_list': {'p50': 10, 'queries': 2}}
+        assert not compare(
+            {'title_list': {'p50': 12, 'queries': 2}}, baseline, 0.25
+        ), 'Отклонение в пределах допуска не считается регрессией'
+        assert len(compare(
+            {'title_list': {'p50': 13, 'queries': 3}}, baseline, 0.25
+        )) == 2, 'Рост задержки и числа запросов считаются регрессией'
+
+    def test_postgresql_copy_seed(self):
+        from api.benchmark import SCENARIOS, Benchmark
+        from api.datagen import DataGenerator
+        from django.db import connection
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('COPY проверяется только на PostgreSQL')
+        DataGenerator(COUNTS, use_copy=True).generate()
+        assert list(Benchmark(requests=2).run()) == list(SCENARIOS), (
+            'Сценарии проходят на данных, загруженных через COPY'
+        )
@@ -0,0 +1,156 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleBulk:
+    """Пакетное создание и изменение произведений"""
+
+    url = '/api/v1/titles/bulk/'
+
+    def test_bulk_create(self, admin_client, catalog,
+                         django_assert_max_num_queries):
+        from reviews.models import Title
+
+        payload = [
+            {
+                'name': f'Пакет {i}', 'year': 1990 + i,
+                'category': 'category-1', 'genre': ['genre-0', 'genre-2']
+            }
+            for i in range(20)
+        ]
+        with django_assert_max_num_queries(16):
+            response = admin_client.post(self.url, payload, format='json')
+        assert response.status_code == 201, response.json()
+        created = response.json()
+        assert len(created) == 20
+        assert created[0]['genre'] == ['genre-0', 'genre-2']
+        title = Title.objects.get(pk=created[5]['id'])
+        assert title.category.slug == 'category-1'
+        assert title.genre.count() == 2
+
+    def test_bulk_create_requires_returned_ids(self, catalog, monkeypatch):
+        from api.serializers import WriteTitleSerializer
+        from django.db import NotSupportedError, connection
+        from reviews.models import Title
+
+        monkeypatch.setattr(
+            connection.features, 'can_return_ids_from_bulk_insert', False
+        )
+        monkeypatch.setattr(connection, 'vendor', 'mysql')
+        serializer = WriteTitleSerializer(data=[{
+            'name': 'Пакет', 'year': 2000,
+            'category': 'category-1', 'genre': ['genre-0']
+        }], many=True)
+        assert serializer.is_valid(), serializer.errors
+        count = Title.objects.count()
+        with pytest.raises(NotSupportedError):
+            serializer.save()
+        assert Title.objects.count() == count, (
+            'Без возврата id вне SQLite произведения не вставляются'
+        )
+
+    def test_bulk_errors_per_item(self, admin_client, catalog):
+        from reviews.models import Title
+
+        count = Title.objects.count()
+        response = admin_client.post(self.url, [
+            {'name': 'Верно', 'year': 2000, 'category': 'category-0',
+             'genre': ['genre-0']},
+            {'name': 'Неверно', 'year': 2000, 'category': 'nope',
+             'genre': ['genre-0']},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {} and 'category' in errors[1]
+        assert Title.objects.count() == count
+
+    def test_bulk_update(self, admin_client, api_client, catalog):
+        api_client.get(f'/api/v1/titles/{catalog[0].id}/')
+        response = admin_client.patch(self.url, [
+            {'id': catalog[0].id, 'name': 'Новое имя', 'genre': ['genre-5']},
+            {'id': catalog[1].id, 'category': 'category-3'},
+        ], format='json')
+        assert response.status_code == 200, response.json()
+        card = api_client.get(f'/api/v1/titles/{catalog[0].id}/').json()
+        assert card['name'] == 'Новое имя'
+        assert [genre['slug'] for genre in card['genre']] == ['genre-5']
+        response = admin_client.patch(
+            self.url, [{'id': 0, 'name': 'x'}], format='json'
+        )
+        assert response.status_code == 400
+
+    def test_bulk_forbidden_for_anonymous(self, api_client, catalog):
+        response = api_client.post(self.url, [], format='json')
+        assert response.status_code == 401
+
+
+@pytest.mark.django_db
+class TestModerationBulk:
+    """Пакетная модерация отзывов и комментариев"""
+
+    def test_reviews_bulk_update_and_delete(self, admin_client, api_client,
+                                            reviews):
+        title_id = reviews[0].title_id
+        url = f'/api/v1/titles/{title_id}/reviews/bulk/'
+        response = admin_client.patch(url, [
+            {'id': review.id, 'score': 10} for review in reviews
+        ], format='json')
+        assert response.status_code == 200, response.json()
+        assert api_client.get(
+            f'/api/v1/titles/{title_id}/'
+        ).json()['rating'] == 10
+        response = admin_client.delete(
+            url, {'ids': [review.id for review in reviews]}, format='json'
+        )
+        assert response.status_code == 204
+        card = api_client.get(f'/api/v1/titles/{title_id}/').json()
+        assert card['rating'] is None
+
+    def test_bulk_update_rejects_boolean_ids(self, admin_client, reviews):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{reviews[0].title_id}/reviews/bulk/'
+        first = Review.objects.order_by('pk').first()
+        response = admin_client.patch(
+            url, [{'id': True, 'text': 'Подмена'}], format='json'
+        )
+        assert response.status_code == 400, (
+            'true из JSON не принимается за id 1'
+        )
+        first.refresh_from_db()
+        assert first.text != 'Подмена'
+
+    def test_comments_bulk_for_author_forbidden(self, reviews):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(reviews[0].author)
+        review = reviews[0]
+        response = client.delete(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+            '/comments/bulk/',
+            {'ids': []}, format='json'
+        )
+        assert response.status_code == 403
+
+    def test_bulk_delete_validates_ids(self, admin_client, reviews):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{reviews[0].title_id}/reviews/bulk/'
+        for data in (
+            {'ids': ['abc']}, {'ids': []}, {'ids': 5}, [1], {'ids': [True]}
+        ):
+            response = admin_client.delete(url, data, format='json')
+            assert response.status_code == 400, (
+                f'Неверный список id {data} отклоняется'
+            )
+        response = admin_client.delete(
+            url, {'ids': [reviews[0].id, 10 ** 6]}, format='json'
+        )
+        assert response.status_code == 404, (
+            'Удаление несуществующих объектов отвечает 404'
+        )
+        assert str(10 ** 6) in response.content.decode()
+        assert Review.objects.count() == len(reviews), (
+            'При отсутствующих id ничего не удаляется'
+        )
@@ -0,0 +1,85 @@
+import datetime as dt
+
+import pytest
+
+
+def write_catalog(use_copy):
+    """Строки с NULL, пустыми строками и явными датами одной пачкой"""
+    from api.bulk import BulkWriter
+    from django.utils import timezone
+    from reviews.models import Review, Title, User
+
+    explicit = timezone.make_aware(dt.datetime(2001, 2, 3, 4, 5, 6))
+    with BulkWriter(User, use_copy=use_copy) as writer:
+        writer.write(User(username='null', email='null@yamdb.fake'))
+        writer.write(User(
+            username='empty', email='empty@yamdb.fake', bio='',
+            last_login=explicit
+        ))
+    with BulkWriter(Title, use_copy=use_copy) as writer:
+        writer.write(Title(name='Без описания', year=2000))
+        writer.write(Title(name='"Кавычки"', year=2001, description=''))
+    title = Title.objects.get(year=2000)
+    with BulkWriter(Review, use_copy=use_copy) as writer:
+        for user, pub_date in zip(
+            User.objects.order_by('username'), (explicit, None)
+        ):
+            writer.write(Review(
+                title=title, author=user, text='Отзыв', pub_date=pub_date
+            ))
+    return explicit
+
+
+def check_catalog(explicit):
+    from reviews.models import Review, Title, User
+
+    null = User.objects.get(username='null')
+    assert null.last_login is None and null.bio is None, (
+        'None записывается как NULL'
+    )
+    assert User.objects.get(username='empty').bio == '', (
+        'Пустая строка не превращается в NULL'
+    )
+    assert list(Title.objects.order_by('year').values_list(
+        'name', 'description', 'rating'
+    )) == [('Без описания', None, None), ('"Кавычки"', '', None)]
+    dates = dict(Review.objects.values_list('author__username', 'pub_date'))
+    assert dates['empty'] == explicit, 'Явная дата auto_now_add сохраняется'
+    assert dates['null'] is not None and dates['null'] > explicit, (
+        'Пустая дата auto_now_add заполняется текущим временем'
+    )
+
+
+@pytest.mark.django_db
+class TestBulkWriter:
+    """Пакетная запись сохраняет NULL, пустые строки и явные даты"""
+
+    def test_copy_line(self):
+        from api.bulk import COPY_NULL, copy_line
+
+        assert copy_line([None, '', 5, 'a"b', COPY_NULL, True]) == (
+            '\\N,"","5","a""b","\\N","True"\n'
+        ), 'NULL без кавычек, любое значение, даже "\\N", — в кавычках'
+
+    def test_insert(self, monkeypatch):
+        from api.bulk import BulkWriter
+        from reviews.models import Review
+
+        field = Review._meta.get_field('pub_date')
+        insert = BulkWriter.insert
+
+        def checked_insert(writer, instances):
+            assert field.auto_now_add, (
+                'Поле модели не меняется на время записи'
+            )
+            insert(writer, instances)
+
+        monkeypatch.setattr(BulkWriter, 'insert', checked_insert)
+        check_catalog(write_catalog(use_copy=False))
+
+    def test_postgresql_copy(self):
+        from django.db import connection
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('COPY проверяется только на PostgreSQL')
+        check_catalog(write_catalog(use_copy=True))
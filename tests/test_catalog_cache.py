@@ -0,0 +1,38 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestCatalogCache:
+    """Кэш списков категорий и жанров сбрасывается при изменениях"""
+
+    @pytest.mark.parametrize('url', ('/api/v1/categories/', '/api/v1/genres/'))
+    def test_list_cached(self, api_client, catalog, url,
+                         django_assert_num_queries):
+        first = api_client.get(url, {'search': 'Жанр'}).json()
+        with django_assert_num_queries(0):
+            second = api_client.get(url, {'search': 'Жанр'}).json()
+        assert first == second
+
+    def test_pages_share_key(self, api_client, catalog,
+                             django_assert_num_queries):
+        url = '/api/v1/genres/'
+        first = api_client.get(url, {'search': 'Жанр'}).json()
+        with django_assert_num_queries(0):
+            second = api_client.get(url, {
+                'search': 'Жанр,Жанр', 'page': 2, 'utm_source': 'mail'
+            }, HTTP_HOST='mirror.yamdb.fake').json()
+        assert second['count'] == first['count'] == 6
+        assert second['previous'].startswith('http://mirror.yamdb.fake/'), (
+            'Ссылки на страницы строятся по текущему запросу, а не из кэша'
+        )
+
+    @pytest.mark.parametrize('url', ('/api/v1/categories/', '/api/v1/genres/'))
+    def test_create_and_delete_invalidate(self, admin_client, catalog, url):
+        count = admin_client.get(url).json()['count']
+        response = admin_client.post(url, {'name': 'Новая', 'slug': 'new'})
+        assert response.status_code == 201
+        assert admin_client.get(url).json()['count'] == count + 1, (
+            'Проверьте, что создание записи сбрасывает кэш списка'
+        )
+        assert admin_client.delete(f'{url}new/').status_code == 204
+        assert admin_client.get(url).json()['count'] == count
@@ -0,0 +1,131 @@
+import json
+
+import pytest
+
+from .fixtures.fixture_data import TITLES_COUNT
+
+EXPORT_URL = '/api/v1/export/'
+
+
+@pytest.mark.django_db
+class TestCatalogExport:
+    """Выгрузка каталога в NDJSON"""
+
+    def test_export_requires_admin(self, api_client, catalog):
+        response = api_client.get(EXPORT_URL)
+        assert response.status_code == 401, (
+            'Выгрузка недоступна анонимному пользователю'
+        )
+
+    def test_export_streams_titles(self, admin_client, reviews):
+        response = admin_client.get(EXPORT_URL)
+        assert response.status_code == 200
+        assert response.streaming, 'Выгрузка должна отдаваться потоком'
+        assert response['Content-Type'] == 'application/x-ndjson'
+        records = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert len(records) == TITLES_COUNT, (
+            'Каждое произведение выгружается одной строкой'
+        )
+        first = records[0]
+        assert first['category']['slug'] == 'category-0'
+        assert len(first['genre']) == 3
+        assert len(first['reviews']) == len(reviews)
+        assert [
+            len(review['comments']) for review in first['reviews']
+        ] == [8] * len(reviews), 'Отзывы выгружаются с комментариями'
+        assert first['reviews'][0]['author'] == 'author0'
+
+    def test_queries_per_chunk(self, reviews,
+                               django_assert_max_num_queries):
+        from api.export import export_catalog
+
+        chunks = -(-TITLES_COUNT // 5)
+        # + SAVEPOINT и RELEASE транзакции снимка внутри теста
+        with django_assert_max_num_queries(chunks * 4 + 3):
+            lines = list(export_catalog(chunk_size=5))
+        assert len(lines) == TITLES_COUNT
+
+    def test_orphan_rows_do_not_stall_stream(self):
+        from api.export import Rows
+
+        comments = Rows([
+            {'title': 1, 'review': 3, 'id': 10},
+            {'title': 1, 'review': 5, 'id': 11},
+            {'title': 1, 'review': 5, 'id': 12},
+            {'title': 2, 'review': 4, 'id': 13},
+        ])
+        fields = ('title', 'review')
+        assert [row['id'] for row in comments.take(fields, (1, 5))] == [
+            11, 12
+        ], 'Комментарий без выгруженного отзыва пропускается'
+        assert not list(comments.take(fields, (1, 7)))
+        assert [row['id'] for row in comments.take(fields, (2, 4))] == [
+            13
+        ], 'Строки следующего произведения с меньшим id отзыва остаются'
+
+    def test_rows_are_read_in_bounded_pages(self, reviews, catalog):
+        from api.export import export_catalog
+        from api.records import date_record
+        from django.db import connection
+        from reviews.models import Comment, Title
+
+        Comment.objects.filter(
+            review=reviews[1]
+        ).update(review=reviews[0])
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            text = ''.join(export_catalog(chunk_size=4, rows=3))
+        pages = [
+            sql for sql in statements
+            if 'FROM "reviews_review"' in sql
+            or 'FROM "reviews_comment"' in sql
+        ]
+        assert len(pages) > 2 and all('LIMIT 3' in sql for sql in pages), (
+            'Отзывы и комментарии читаются пачками по rows строк'
+        )
+
+        def expected(title):
+            return {
+                'id': title.pk, 'name': title.name, 'year': title.year,
+                'rating': title.rating, 'description': title.description,
+                'category': title.category and {
+                    'name': title.category.name, 'slug': title.category.slug
+                },
+                'genre': [
+                    {'name': genre.name, 'slug': genre.slug}
+                    for genre in title.genre.order_by('name')
+                ],
+                'reviews': [{
+                    'id': review.pk, 'text': review.text,
+                    'author': review.author.username, 'score': review.score,
+                    'pub_date': date_record(review.pub_date),
+                    'comments': [{
+                        'id': comment.pk, 'text': comment.text,
+                        'author': comment.author.username,
+                        'pub_date': date_record(comment.pub_date),
+                    } for comment in review.comments.order_by('pk')]
+                } for review in title.reviews.order_by('pk')]
+            }
+
+        assert text == ''.join(
+            json.dumps(expected(title), ensure_ascii=False) + '\n'
+            for title in Title.objects.order_by('pk')
+        ), 'Строки, собранные по частям, совпадают с json.dumps записи'
+
+    def test_command_matches_endpoint(self, admin_client, reviews, tmp_path):
+        from django.core.management import call_command
+
+        output = tmp_path / 'catalog.ndjson'
+        call_command('export_catalog', output=str(output), chunk_size=3)
+        response = admin_client.get(EXPORT_URL)
+        assert output.read_bytes() == b''.join(
+            response.streaming_content
+        ), 'Команда и эндпоинт выгружают одинаковые данные'
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """Ответ 304 без запросов к базе, пока данные не изменились"""
+
+    @pytest.mark.parametrize('path', ('', '{title}/', '{title}/reviews/'))
+    def test_etag(self, api_client, admin_client, reviews, path,
+                  django_assert_num_queries):
+        url = '/api/v1/titles/' + path.format(title=reviews[0].title_id)
+        response = api_client.get(url)
+        etag = response['ETag']
+        assert not response.has_header('Last-Modified'), (
+            'Last-Modified с точностью до секунды не отдается'
+        )
+        with django_assert_num_queries(0):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert not response.content
+        admin_client.post(
+            f'/api/v1/titles/{reviews[0].title_id}/reviews/',
+            {'text': 'Новый отзыв', 'score': 1}
+        )
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый отзыв меняет ETag'
+        )
+        assert response['ETag'] != etag
+
+    def test_if_modified_since_is_ignored(self, api_client, reviews):
+        review = reviews[0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        response = api_client.get(
+            url, HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 2099 00:00:00 GMT'
+        )
+        assert response.status_code == 200, (
+            'Без Last-Modified ответ 304 дает только ETag'
+        )
+
+    def test_rename_changes_etag(self, api_client, admin_client, reviews):
+        review = reviews[0]
+        urls = (
+            f'/api/v1/titles/{review.title_id}/reviews/',
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/',
+        )
+        etags = [api_client.get(url)['ETag'] for url in urls]
+        author = review.author
+        response = admin_client.patch(
+            f'/api/v1/users/{author.username}/', {'username': 'renamed'}
+        )
+        assert response.status_code == 200, response.json()
+        for url, etag in zip(urls, etags):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Смена имени автора меняет ETag списка {url}'
+            )
@@ -0,0 +1,78 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestDataGenerator:
+    """Генератор синтетических данных с перекосом популярности"""
+
+    def review_counts(self):
+        from django.db.models import Count
+        from reviews.models import Review
+
+        return list(
+            Review.objects.values('title').annotate(total=Count('pk'))
+            .order_by('-total').values_list('total', flat=True)
+        )
+
+    def test_popularity_is_skewed(self):
+        from api.datagen import DataGenerator
+
+        DataGenerator({
+            'users': 200, 'titles': 200, 'reviews': 2000, 'comments': 0
+        }, zipf=1.1).generate()
+        counts = self.review_counts()
+        assert counts[0] > 10 * counts[len(counts) // 2], (
+            'Популярные произведения получают большую часть отзывов'
+        )
+
+    def test_saturated_titles(self):
+        from api.datagen import DataGenerator
+        from reviews.models import Review
+
+        DataGenerator({
+            'users': 3, 'titles': 5, 'reviews': 15, 'comments': 10
+        }, zipf=2).generate()
+        assert self.review_counts() == [3] * 5, (
+            'Излишек отзывов популярных произведений раздается остальным'
+        )
+        assert Review.objects.values('title', 'author').distinct().count() == 15
+
+    def test_chunks_get_contiguous_ids(self, monkeypatch):
+        from api import datagen
+        from reviews.models import Comment, Review
+
+        monkeypatch.setattr(datagen, 'CHUNK_REVIEWS', 7)
+        datagen.DataGenerator({
+            'users': 10, 'titles': 20, 'reviews': 50, 'comments': 33
+        }).generate()
+        assert list(Review.objects.order_by('pk').values_list(
+            'pk', flat=True
+        )) == list(range(1, 51)), 'Пачки получают непересекающиеся id'
+        assert Comment.objects.count() == 33, (
+            'Комментарии распределяются по пачкам без потерь'
+        )
+
+    def test_too_many_reviews(self):
+        from api.datagen import DataGenerator
+
+        with pytest.raises(ValueError):
+            DataGenerator({'users': 2, 'titles': 2, 'reviews': 5}).generate()
+
+    def test_postgresql_copy(self):
+        from api.datagen import DataGenerator
+        from django.db import connection
+        from reviews.models import Comment, Review, Title, User
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('COPY проверяется только на PostgreSQL')
+        DataGenerator({
+            'users': 20, 'titles': 30, 'reviews': 100, 'comments': 50
+        }, use_copy=True).generate()
+        assert Review.objects.count() == 100
+        assert Comment.objects.count() == 50
+        assert not User.objects.filter(last_login__isnull=False).exists(), (
+            'Пустые даты входа загружаются через COPY как NULL'
+        )
+        assert not Title.objects.filter(description__isnull=False).exists(), (
+            'Пустые описания остаются NULL, а не пустой строкой'
+        )
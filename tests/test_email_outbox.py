@@ -0,0 +1,144 @@
+import os
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+    """Письмо при регистрации ставится в очередь и отправляется обработчиком"""
+
+    def test_signup_queues_email(self, api_client, settings, tmp_path):
+        from api.models import OutboxEmail
+
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.filebased.EmailBackend'
+        )
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        response = api_client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+        )
+        assert response.status_code == 200
+        assert not os.listdir(tmp_path), (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.status == OutboxEmail.PENDING
+
+        call_command('send_emails', '--once', stdout=open(os.devnull, 'w'))
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.SENT
+        sent = ''.join(
+            open(tmp_path / name, encoding='utf-8').read()
+            for name in os.listdir(tmp_path)
+        )
+        assert 'newbie@yamdb.fake' in sent
+
+    def test_failed_email_is_retried(self, settings):
+        from api.models import OutboxEmail
+        from api.services import send_outbox
+
+        class BrokenConnection:
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def send_messages(self, messages):
+                raise ConnectionError('smtp недоступен')
+
+        email = OutboxEmail.objects.create(
+            address='a@yamdb.fake', subject='тема', body='текст'
+        )
+        settings.REVIEW = {**settings.REVIEW, 'OUTBOX_MAX_ATTEMPTS': 2}
+        assert send_outbox(BrokenConnection()) == 1
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.PENDING
+        assert email.attempts == 1 and email.next_attempt > email.created
+        assert send_outbox(BrokenConnection()) == 0
+        OutboxEmail.objects.update(next_attempt=email.created)
+        send_outbox(BrokenConnection())
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.FAILED
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reconnect_after_disconnect(self):
+        from smtplib import SMTPServerDisconnected
+
+        from api.models import OutboxEmail
+        from api.services import send_outbox
+        from django.db import connection as db
+
+        class FlakyConnection:
+            def __init__(self):
+                self.is_open = False
+                self.opened = 0
+                self.sent = []
+
+            def open(self):
+                if not self.is_open:
+                    self.is_open = True
+                    self.opened += 1
+
+            def close(self):
+                self.is_open = False
+
+            def send_messages(self, messages):
+                assert not db.in_atomic_block, (
+                    'Письмо отправляется без открытой транзакции'
+                )
+                if self.opened == 1 and len(self.sent) == 1:
+                    self.is_open = False
+                    raise SMTPServerDisconnected('соединение закрыто')
+                self.sent.extend(messages)
+
+        connection = FlakyConnection()
+        for number in range(3):
+            OutboxEmail.objects.create(
+                address=f'{number}@yamdb.fake', subject='тема', body='текст'
+            )
+        assert send_outbox(connection) == 3
+        assert connection.opened == 2, 'После обрыва соединение открывается'
+        assert len(connection.sent) == 3
+        assert set(OutboxEmail.objects.values_list(
+            'status', flat=True
+        )) == {OutboxEmail.SENT}
+
+    def test_reclaimed_email_is_not_sent_twice(self):
+        from api.models import OutboxEmail
+        from api.services import claim_outbox, send_outbox
+        from django.utils import timezone
+
+        class SlowConnection:
+            """Захват остальных писем истекает во время первой отправки"""
+
+            def __init__(self):
+                self.sent = []
+                self.reclaimed = []
+
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def send_messages(self, messages):
+                if not self.sent:
+                    OutboxEmail.objects.exclude(
+                        address='0@yamdb.fake'
+                    ).update(next_attempt=timezone.now())
+                    self.reclaimed = claim_outbox(10)
+                self.sent.extend(messages)
+
+        for number in range(3):
+            OutboxEmail.objects.create(
+                address=f'{number}@yamdb.fake', subject='тема', body='текст'
+            )
+        connection = SlowConnection()
+        assert send_outbox(connection) == 1
+        assert [message.to for message in connection.sent] == [
+            ['0@yamdb.fake']
+        ], 'Письма, захваченные другим обработчиком, пропускаются'
+        assert len(connection.reclaimed) == 2
@@ -0,0 +1,61 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Пагинация по ключу (pub_date, id) для отзывов"""
+
+    def test_keyset_pages(self, api_client, reviews,
+                          django_assert_num_queries):
+        from reviews.models import Review
+
+        Review.objects.update(pub_date=reviews[0].pub_date)
+        url = f'/api/v1/titles/{reviews[0].title_id}/reviews/?cursor='
+        expected = api_client.get(
+            f'/api/v1/titles/{reviews[0].title_id}/reviews/'
+        ).json()['results']
+        seen = []
+        pages = []
+        while url:
+            with django_assert_num_queries(1):
+                data = api_client.get(url).json()
+            assert 'count' not in data
+            seen.extend(item['id'] for item in data['results'])
+            pages.append(data)
+            url = data['next']
+        assert len(seen) == len(reviews) == len(set(seen))
+        assert seen[:len(expected)] == [item['id'] for item in expected]
+        previous = api_client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results']
+
+    def test_invalid_cursor(self, api_client, reviews):
+        response = api_client.get(
+            f'/api/v1/titles/{reviews[0].title_id}/reviews/?cursor=xx'
+        )
+        assert response.status_code == 404
+
+    def test_malformed_date_in_cursor(self, api_client, reviews):
+        from base64 import b64encode
+
+        cursor = b64encode(b'0|garbage|5').decode('ascii')
+        response = api_client.get(
+            f'/api/v1/titles/{reviews[0].title_id}/reviews/?cursor={cursor}'
+        )
+        assert response.status_code == 404, (
+            'Курсор с неразборчивой датой считается неверным'
+        )
+
+    def test_rows_without_date(self, api_client, reviews):
+        from reviews.models import Review
+
+        Review.objects.filter(pk=reviews[0].pk).update(pub_date=None)
+        url = f'/api/v1/titles/{reviews[0].title_id}/reviews/?cursor='
+        seen = []
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == 200
+            seen.extend(item['id'] for item in response.json()['results'])
+            url = response.json()['next']
+        assert sorted(seen) == sorted(review.pk for review in reviews[1:]), (
+            'Записи без даты не имеют ключа и пропускаются'
+        )
@@ -0,0 +1,115 @@
+import re
+
+import pytest
+
+METRICS_URL = '/metrics'
+METRICS_TOKEN = 'scraper-token'
+
+
+@pytest.fixture
+def scraper(api_client, settings):
+    settings.REVIEW = {**settings.REVIEW, 'METRICS_TOKEN': METRICS_TOKEN}
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {METRICS_TOKEN}')
+    return api_client
+
+
+@pytest.fixture
+def registry():
+    from api.metrics import registry
+
+    registry.clear()
+    return registry
+
+
+def metric(text, name, view, action):
+    match = re.search(
+        rf'^{name}{{view="{view}",action="{action}"}} (\S+)$',
+        text, re.MULTILINE
+    )
+    return None if match is None else float(match.group(1))
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    """Метрики производительности по представлениям и действиям"""
+
+    def test_metrics_per_action(self, api_client, catalog, registry,
+                                scraper, django_assert_num_queries):
+        from rest_framework.test import APIClient
+
+        api_client = APIClient()
+        with django_assert_num_queries(4):
+            api_client.get('/api/v1/titles/')
+        api_client.get(f'/api/v1/titles/{catalog[0].id}/')
+        text = scraper.get(METRICS_URL).content.decode()
+        assert metric(
+            text, 'yamdb_request_duration_seconds_count',
+            'TitleViewSet', 'list'
+        ) == 1, 'Запрос списка учитывается в гистограмме'
+        assert re.search(
+            r'^yamdb_request_duration_seconds_bucket\{view="TitleViewSet",'
+            r'action="retrieve",le="\+Inf"\} 1$', text, re.MULTILINE
+        ), 'Гистограмма содержит корзину +Inf'
+        assert metric(
+            text, 'yamdb_db_queries_total', 'TitleViewSet', 'list'
+        ) == 4, (
+            'Число запросов к базе считается по каждому действию'
+        )
+        assert metric(
+            text, 'yamdb_serializer_seconds_total', 'TitleViewSet', 'list'
+        ) > 0, 'Время сериализации учитывается'
+        assert metric(
+            text, 'yamdb_response_bytes_total', 'TitleViewSet', 'retrieve'
+        ) > 0, 'Размер ответа учитывается'
+
+    def test_server_timing(self, api_client, catalog, settings):
+        response = api_client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response, (
+            'Заголовок Server-Timing по умолчанию выключен'
+        )
+        settings.REVIEW = {**settings.REVIEW, 'SERVER_TIMING': True}
+        response = api_client.get('/api/v1/titles/')
+        assert re.match(
+            r'db;dur=[\d.]+;desc="\d+ queries", serializer;dur=[\d.]+, '
+            r'total;dur=[\d.]+$', response['Server-Timing']
+        ), 'Server-Timing содержит время базы, сериализации и общее'
+
+    def test_access_requires_token(self, api_client, settings):
+        assert api_client.get(METRICS_URL).status_code == 403, (
+            'Без заданного токена метрики закрыты'
+        )
+        settings.REVIEW = {**settings.REVIEW, 'METRICS_TOKEN': METRICS_TOKEN}
+        assert api_client.get(METRICS_URL).status_code == 403
+        api_client.credentials(HTTP_AUTHORIZATION='Bearer wrong')
+        assert api_client.get(METRICS_URL).status_code == 403, (
+            'Метрики отдаются только с верным токеном'
+        )
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {METRICS_TOKEN}')
+        assert api_client.get(METRICS_URL).status_code == 200
+
+    def test_streaming_size_is_unknown(self, admin_client, catalog, registry,
+                                       scraper):
+        response = admin_client.get('/api/v1/export/')
+        b''.join(response.streaming_content)
+        text = scraper.get(METRICS_URL).content.decode()
+        assert metric(
+            text, 'yamdb_streamed_responses_total', 'export', 'get'
+        ) == 1, 'Потоковые ответы считаются отдельно'
+        assert metric(
+            text, 'yamdb_response_bytes_total', 'export', 'get'
+        ) == 0, 'Неизвестный размер не записывается нулем в объем'
+
+    def test_unknown_methods_share_label(self, api_client, registry, scraper):
+        from api.metrics import OTHER_METHOD, RequestStats
+
+        for method in ('FOO', 'BAR', 'PROPFIND'):
+            api_client.generic(method, '/api/v1/export/')
+        assert set(registry.series) == {('export', OTHER_METHOD)}, (
+            'Выдуманные методы не порождают новых серий'
+        )
+        registry.observe(('A"b\\c\nd', 'get'), 0.1, RequestStats(), 1)
+        text = scraper.get(METRICS_URL).content.decode()
+        assert 'view="A\\"b\\\\c\\nd",action="get"' in text, (
+            'Кавычки, обратная косая черта и перевод строки экранируются'
+        )
+
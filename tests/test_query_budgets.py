@@ -0,0 +1,221 @@
+import pytest
+
+from .query_budgets import BUDGETS, count_queries, route_labels
+
+ROWS = 5
+
+
+def populate(rows):
+    """Данные, в которых каждой связанной сущности ровно rows"""
+    from api.services import rebuild_ratings
+    from reviews.models import Category, Comment, Genre, Review, Title, User
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(rows)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(rows)
+    ]
+    spare = Genre.objects.create(name='Запасной жанр', slug='spare')
+    titles = []
+    for i, category in enumerate(categories):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    users = [
+        User.objects.create(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(rows)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=user, text=f'Отзыв {i}', score=i + 1
+        )
+        for i, user in enumerate(users)
+    ]
+    comments = [
+        Comment.objects.create(
+            review=reviews[0], author=user, text=f'Комментарий {i}'
+        )
+        for i, user in enumerate(users)
+    ]
+    User.objects.create(
+        username='applicant', email='applicant@yamdb.fake', code='secret',
+        is_active=False
+    )
+    rebuild_ratings()
+    return {
+        'title': titles[0].id,
+        'review': reviews[0].id,
+        'comment': comments[0].id,
+        'username': users[0].username,
+        'genre': genres[0].slug,
+        'category': categories[0].slug,
+        'titles': [title.id for title in titles],
+        'reviews': [review.id for review in reviews],
+        'comments': [comment.id for comment in comments],
+        'genres': [genre.slug for genre in genres],
+        'spare': spare.slug,
+    }
+
+
+def title_data(world):
+    return {
+        'name': 'Новое', 'year': 2020, 'genre': world['genres'],
+        'category': world['category']
+    }
+
+
+REVIEWS = '/api/v1/titles/{title}/reviews/'
+COMMENTS = '/api/v1/titles/{title}/reviews/{review}/comments/'
+
+# (метка, метод, адрес, тело запроса по данным populate)
+CASES = (
+    (('APIRootView', 'get'), 'get', '/api/v1/', None),
+    (('UserViewSet', 'list'), 'get', '/api/v1/users/', None),
+    (('UserViewSet', 'list'), 'get', '/api/v1/users/?search=user', None),
+    (('UserViewSet', 'create'), 'post', '/api/v1/users/', lambda world: {
+        'username': 'newcomer', 'email': 'newcomer@yamdb.fake'
+    }),
+    (('UserViewSet', 'retrieve'), 'get', '/api/v1/users/{username}/', None),
+    (('UserViewSet', 'update'), 'put', '/api/v1/users/{username}/',
+     lambda world: {'username': 'renamed', 'email': 'renamed@yamdb.fake'}),
+    (('UserViewSet', 'partial_update'), 'patch', '/api/v1/users/{username}/',
+     lambda world: {'bio': 'О себе'}),
+    (('UserViewSet', 'destroy'), 'delete', '/api/v1/users/{username}/', None),
+    (('UserViewSet', 'me'), 'get', '/api/v1/users/me/', None),
+    (('UserViewSet', 'me'), 'patch', '/api/v1/users/me/',
+     lambda world: {'bio': 'О себе'}),
+    (('CategoryViewSet', 'list'), 'get', '/api/v1/categories/', None),
+    (('CategoryViewSet', 'create'), 'post', '/api/v1/categories/',
+     lambda world: {'name': 'Новая', 'slug': 'new'}),
+    (('CategoryViewSet', 'destroy'), 'delete',
+     '/api/v1/categories/{category}/', None),
+    (('GenreViewSet', 'list'), 'get', '/api/v1/genres/', None),
+    (('GenreViewSet', 'create'), 'post', '/api/v1/genres/',
+     lambda world: {'name': 'Новый', 'slug': 'new'}),
+    (('GenreViewSet', 'destroy'), 'delete', '/api/v1/genres/{genre}/', None),
+    (('TitleViewSet', 'list'), 'get', '/api/v1/titles/', None),
+    (('TitleViewSet', 'list'), 'get',
+     '/api/v1/titles/?genre={genre}&ordering=-rating', None),
+    (('TitleViewSet', 'create'), 'post', '/api/v1/titles/', title_data),
+    (('TitleViewSet', 'retrieve'), 'get', '/api/v1/titles/{title}/', None),
+    (('TitleViewSet', 'update'), 'put', '/api/v1/titles/{title}/',
+     title_data),
+    (('TitleViewSet', 'partial_update'), 'patch', '/api/v1/titles/{title}/',
+     lambda world: {'genre': [world['spare']]}),
+    (('TitleViewSet', 'destroy'), 'delete', '/api/v1/titles/{title}/', None),
+    (('TitleViewSet', 'bulk'), 'post', '/api/v1/titles/bulk/',
+     lambda world: [title_data(world)] * len(world['titles'])),
+    (('TitleViewSet', 'bulk'), 'patch', '/api/v1/titles/bulk/',
+     lambda world: [
+         {'id': pk, 'year': 1999, 'genre': [world['spare']]}
+         for pk in world['titles']
+     ]),
+    (('TitleViewSet', 'facets'), 'get',
+     '/api/v1/titles/facets/?genre={genre}', None),
+    (('TitleViewSet', 'top'), 'get', '/api/v1/titles/top/', None),
+    (('ReviewViewSet', 'list'), 'get', REVIEWS, None),
+    (('ReviewViewSet', 'list'), 'get', REVIEWS + '?cursor=', None),
+    (('ReviewViewSet', 'create'), 'post', REVIEWS,
+     lambda world: {'text': 'Отзыв', 'score': 5}),
+    (('ReviewViewSet', 'retrieve'), 'get', REVIEWS + '{review}/', None),
+    (('ReviewViewSet', 'update'), 'put', REVIEWS + '{review}/',
+     lambda world: {'text': 'Отзыв', 'score': 5}),
+    (('ReviewViewSet', 'partial_update'), 'patch', REVIEWS + '{review}/',
+     lambda world: {'score': 2}),
+    (('ReviewViewSet', 'destroy'), 'delete', REVIEWS + '{review}/', None),
+    (('ReviewViewSet', 'bulk'), 'patch', REVIEWS + 'bulk/',
+     lambda world: [
+         {'id': pk, 'score': 3} for pk in world['reviews']
+     ]),
+    (('ReviewViewSet', 'bulk'), 'delete', REVIEWS + 'bulk/',
+     lambda world: {'ids': world['reviews']}),
+    (('CommentViewSet', 'list'), 'get', COMMENTS, None),
+    (('CommentViewSet', 'create'), 'post', COMMENTS,
+     lambda world: {'text': 'Комментарий'}),
+    (('CommentViewSet', 'retrieve'), 'get', COMMENTS + '{comment}/', None),
+    (('CommentViewSet', 'update'), 'put', COMMENTS + '{comment}/',
+     lambda world: {'text': 'Комментарий'}),
+    (('CommentViewSet', 'partial_update'), 'patch',
+     COMMENTS + '{comment}/', lambda world: {'text': 'Комментарий'}),
+    (('CommentViewSet', 'destroy'), 'delete', COMMENTS + '{comment}/', None),
+    (('CommentViewSet', 'bulk'), 'patch', COMMENTS + 'bulk/',
+     lambda world: [
+         {'id': pk, 'text': 'Комментарий'} for pk in world['comments']
+     ]),
+    (('CommentViewSet', 'bulk'), 'delete', COMMENTS + 'bulk/',
+     lambda world: {'ids': world['comments']}),
+    (('signup', 'post'), 'post', '/api/v1/auth/signup/',
+     lambda world: {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}),
+    (('token', 'post'), 'post', '/api/v1/auth/token/', lambda world: {
+        'username': 'applicant', 'confirmation_code': 'secret'
+    }),
+    (('export', 'get'), 'get', '/api/v1/export/', None),
+    (('autocomplete', 'get'), 'get', '/api/v1/autocomplete/?q=про', None),
+)
+
+
+def measure(admin, rows, method, url, payload):
+    """Число запросов на данных с rows строками; данные откатываются"""
+    from api.authentication import get_access_token
+    from django.db import transaction
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(admin)}')
+    with transaction.atomic():
+        world = populate(rows)
+        data = payload(world) if payload else None
+        with count_queries() as stats:
+            response = getattr(client, method)(
+                url.format(**world), data, format='json'
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+        transaction.set_rollback(True)
+    assert response.status_code < 400, (
+        f'{method.upper()} {url}: {response.status_code}'
+    )
+    return stats.queries
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    """Число запросов каждого маршрута ограничено и не растет с данными"""
+
+    def test_every_route_is_covered(self):
+        labels = route_labels()
+        assert labels == set(BUDGETS), (
+            'Бюджет запросов задается для каждого маршрута api/urls.py'
+        )
+        assert labels == {case[0] for case in CASES}, (
+            'Каждый маршрут проверяется хотя бы одним запросом'
+        )
+
+    @pytest.mark.parametrize(
+        'label, method, url, payload', CASES,
+        ids=[f'{method}:{url}' for _, method, url, _ in CASES]
+    )
+    def test_budget(self, admin, label, method, url, payload):
+        # корень API доступен только персоналу
+        admin.is_staff = True
+        admin.save()
+        admin.refresh_from_db()
+        # на одной строке срабатывают короткие пути вроде одиночного
+        # UPDATE в apply_changes, поэтому рост сравнивается на ROWS и 2 * ROWS
+        single, many, more = (
+            measure(admin, rows, method, url, payload)
+            for rows in (1, ROWS, 2 * ROWS)
+        )
+        assert max(single, many, more) <= BUDGETS[label], (
+            f'{method.upper()} {url}: {single}, {many} и {more} запросов, '
+            f'бюджет {label} — {BUDGETS[label]}'
+        )
+        assert many == more, (
+            f'{method.upper()} {url}: число запросов растет с числом строк '
+            f'({many} при {ROWS}, {more} при {2 * ROWS})'
+        )
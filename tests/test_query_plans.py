@@ -0,0 +1,96 @@
+import re
+
+import pytest
+
+COUNTS = {
+    'users': 30, 'categories': 5, 'genres': 8,
+    'titles': 200, 'reviews': 600, 'comments': 600,
+}
+# полный проход по таблице без индекса
+SQLITE_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)\S+$')
+
+
+def explain(connection, sql, params):
+    """Строки плана, в которых таблица читается целиком"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return [
+                row[0].strip() for row in cursor.fetchall()
+                if 'Seq Scan' in row[0]
+            ]
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [
+            row[-1] for row in cursor.fetchall()
+            if SQLITE_SCAN.match(row[-1])
+        ]
+
+
+@pytest.fixture
+def seeded(db):
+    from api.datagen import DataGenerator
+    from reviews.models import Review
+
+    DataGenerator(COUNTS, seed=3).generate()
+    review = Review.objects.order_by('pk').first()
+    return {
+        'title': review.title_id,
+        'review': review.id,
+        'genre': review.title.genre.first().slug,
+        'category': review.title.category.slug,
+        'year': review.title.year,
+    }
+
+
+URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?year={year}',
+    '/api/v1/titles/?category={category}',
+    '/api/v1/titles/?genre={genre}',
+    '/api/v1/titles/?year={year}&category={category}&genre={genre}',
+    '/api/v1/titles/?ordering=-rating',
+    '/api/v1/titles/?ordering=year',
+    '/api/v1/titles/?category={category}&ordering=-year',
+    '/api/v1/titles/{title}/',
+    '/api/v1/titles/top/?genre={genre}',
+    '/api/v1/titles/top/?category={category}',
+    '/api/v1/titles/facets/?genre={genre}&year={year}',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/?cursor=',
+    '/api/v1/titles/{title}/reviews/{review}/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/?cursor=',
+    '/api/v1/genres/',
+    '/api/v1/categories/',
+    '/api/v1/users/',
+    '/api/v1/users/?search=user1',
+)
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+    """Запросы основных страниц API читают таблицы через индексы"""
+
+    @pytest.mark.parametrize('url', URLS)
+    def test_no_full_scans(self, admin_client, seeded, url):
+        from django.db import connection
+
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith('SELECT'):
+                queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        url = url.format(**seeded)
+        with connection.execute_wrapper(record):
+            response = admin_client.get(url)
+        assert response.status_code == 200, url
+        scans = {
+            sql: plan for sql, params in queries
+            for plan in [explain(connection, sql, params)] if plan
+        }
+        assert not scans, (
+            f'Полный проход по таблице для {url}: {scans}'
+        )
@@ -0,0 +1,71 @@
+import pytest
+
+
+def counters(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count, title.rating
+
+
+@pytest.mark.django_db
+class TestRatingCounters:
+    """Счетчики рейтинга меняются вместе с отзывами"""
+
+    def test_counters_follow_review_writes(self, catalog, django_user_model):
+        from rest_framework.test import APIClient
+
+        title = catalog[0]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        clients = []
+        for number, score in enumerate((5, 6)):
+            client = APIClient()
+            client.force_authenticate(django_user_model.objects.create(
+                username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+            ))
+            response = client.post(url, {'text': 'Отзыв', 'score': score})
+            assert response.status_code == 201, response.json()
+            clients.append((client, response.json()['id']))
+        assert counters(title) == (11, 2, 6), (
+            'Создание отзыва добавляет оценку, 5,5 округляется до 6'
+        )
+        client, review_id = clients[1]
+        response = client.patch(f'{url}{review_id}/', {'score': 10})
+        assert response.status_code == 200
+        assert counters(title) == (15, 2, 8), (
+            'Изменение оценки меняет только сумму'
+        )
+        assert client.delete(f'{url}{review_id}/').status_code == 204
+        assert counters(title) == (5, 1, 5), 'Удаление отзыва вычитает оценку'
+        client, review_id = clients[0]
+        assert client.delete(f'{url}{review_id}/').status_code == 204
+        assert counters(title) == (0, 0, None), (
+            'Без отзывов рейтинг не определен'
+        )
+
+    def test_rebuild_ratings_restores_drift(self, reviews):
+        from api.services import rebuild_ratings
+        from django.db.models import Count, Sum
+        from reviews.models import Review, Title
+
+        Title.objects.update(rating_sum=999, rating_count=7, rating=1)
+        rebuild_ratings()
+        totals = Review.objects.aggregate(total=Sum('score'), count=Count('pk'))
+        title = reviews[0].title
+        assert counters(title) == (
+            totals['total'], totals['count'],
+            (2 * totals['total'] + totals['count']) // (2 * totals['count'])
+        ), 'Пересчет восстанавливает счетчики по отзывам'
+        assert not Title.objects.exclude(pk=title.pk).exclude(
+            rating_sum=0, rating_count=0, rating=None
+        ).exists(), 'Произведения без отзывов получают пустой рейтинг'
+
+    @pytest.mark.parametrize('total, count, rating', (
+        (5, 2, 3), (7, 3, 2), (8, 3, 3), (10, 1, 10), (19, 2, 10),
+    ))
+    def test_rounding(self, catalog, total, count, rating):
+        from api.services import update_rating
+
+        update_rating(catalog[0].pk, total, count)
+        assert counters(catalog[0]) == (total, count, rating), (
+            'Рейтинг — среднее (2 * sum + count) // (2 * count), '
+            'половина округляется вверх'
+        )
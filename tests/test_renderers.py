@@ -0,0 +1,74 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+DATA = {
+    'id': 1,
+    'name': 'Произведение с разделителем',
+    'rating': None,
+    'score': Decimal('7.5'),
+    'pub_date': datetime.datetime(
+        2021, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+    ),
+    'genre': [{'name': 'Драма', 'slug': 'drama'}],
+    'counts': {2001: 3},
+    'big': 2 ** 70,
+}
+
+
+class TestRenderers:
+    """Быстрый JSON совпадает со стандартным JSONRenderer"""
+
+    def test_same_output(self):
+        from api.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_indent_and_fallback(self, monkeypatch):
+        from api import renderers
+        from rest_framework.renderers import JSONRenderer
+
+        media_type = 'application/json; indent=4'
+        assert renderers.FastJSONRenderer().render(DATA, media_type) == (
+            JSONRenderer().render(DATA, media_type)
+        )
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert renderers.FastJSONRenderer().render(DATA) == (
+            JSONRenderer().render(DATA)
+        ), 'Без orjson используется стандартный json'
+
+    def test_parser(self):
+        from io import BytesIO
+
+        from api.parsers import FastJSONParser
+        from rest_framework.exceptions import ParseError
+
+        assert FastJSONParser().parse(
+            BytesIO('{"text": "отзыв", "score": 5}'.encode())
+        ) == {'text': 'отзыв', 'score': 5}
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"score": NaN}'))
+
+
+@pytest.mark.django_db
+class TestMessagePack:
+    """Формат MessagePack выбирается заголовком Accept"""
+
+    def test_title_page(self, api_client, catalog):
+        msgpack = pytest.importorskip('msgpack')
+
+        response = api_client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='application/msgpack'
+        )
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/msgpack'
+        assert msgpack.unpackb(response.content) == (
+            api_client.get('/api/v1/titles/').json()
+        )
+
+    def test_json_stays_default(self, api_client, catalog):
+        response = api_client.get('/api/v1/titles/', HTTP_ACCEPT='*/*')
+        assert response['Content-Type'] == 'application/json'
@@ -0,0 +1,42 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestReviewQueries:
+    """Страница отзывов и комментариев обходится двумя запросами"""
+
+    def test_review_list_queries(self, api_client, reviews,
+                                 django_assert_num_queries):
+        title_id = reviews[0].title_id
+        with django_assert_num_queries(2):
+            response = api_client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert response.status_code == 200
+        assert all(item['author'] for item in response.json()['results'])
+
+    def test_comment_list_queries(self, api_client, reviews,
+                                  django_assert_num_queries):
+        review = reviews[0]
+        with django_assert_num_queries(2):
+            response = api_client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+                '/comments/'
+            )
+        assert response.status_code == 200
+        assert response.json()['count'] == len(reviews)
+
+    def test_empty_and_missing_parent(self, api_client, catalog, reviews):
+        response = api_client.get(f'/api/v1/titles/{catalog[1].id}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 0
+        response = api_client.get('/api/v1/titles/0/reviews/')
+        assert response.status_code == 404
+
+    def test_comment_review_belongs_to_title(self, admin_client, catalog,
+                                             reviews):
+        url = f'/api/v1/titles/{catalog[1].id}/reviews/{reviews[0].id}/'
+        assert admin_client.get(f'{url}comments/').status_code == 404, (
+            'Проверьте, что комментарии доступны только для отзыва '
+            'указанного произведения'
+        )
+        response = admin_client.post(f'{url}comments/', {'text': 'текст'})
+        assert response.status_code == 404
@@ -0,0 +1,67 @@
+import pytest
+
+
+def render(data):
+    from rest_framework.renderers import JSONRenderer
+
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+class TestRowSerializers:
+    """Быстрые сериализаторы совпадают с обычными байт в байт"""
+
+    def test_reviews_and_comments(self, reviews):
+        from api.readers import CommentRowSerializer, ReviewRowSerializer
+        from api.serializers import CommentSerializer, ReviewSerializer
+        from reviews.models import Comment, Review
+
+        reviews[0].author.delete()
+        Review.objects.filter(pk=reviews[1].pk).update(pub_date=None)
+        for model, fast, serializer in (
+            (Review, ReviewRowSerializer, ReviewSerializer),
+            (Comment, CommentRowSerializer, CommentSerializer),
+        ):
+            queryset = model.objects.select_related('author')
+            assert render(fast.serialize(fast.rows(queryset))) == render(
+                serializer(queryset, many=True).data
+            ), f'Проверьте вывод {fast.__name__}'
+
+    def test_title_cards(self, catalog):
+        from api.readers import TitleRowSerializer
+        from api.serializers import ReadTitleSerializer
+        from reviews.models import Title
+
+        Title.objects.filter(pk=catalog[0].pk).update(
+            category=None, description='Описание', rating=7
+        )
+        catalog[1].genre.clear()
+        ids = [title.id for title in catalog]
+        queryset = Title.objects.filter(pk__in=ids).order_by('pk')
+        fast = sorted(TitleRowSerializer.cards(ids), key=lambda x: x['id'])
+        assert render(fast) == render(ReadTitleSerializer(
+            queryset.select_related('category').prefetch_related('genre'),
+            many=True
+        ).data), 'Карточки совпадают с ReadTitleSerializer'
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/?page_size=20',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/?cursor=',
+        '/api/v1/titles/{title}/reviews/{review}/comments/?page=2',
+    ))
+    def test_responses_match(self, api_client, reviews, monkeypatch, url):
+        from api import views
+        from django.core.cache import cache
+
+        url = url.format(title=reviews[0].title_id, review=reviews[0].id)
+        fast = api_client.get(url)
+        assert fast.status_code == 200
+        for viewset in (
+            views.TitleViewSet, views.ReviewViewSet, views.CommentViewSet
+        ):
+            monkeypatch.setattr(viewset, 'row_serializer_class', None)
+        cache.clear()
+        assert fast.content == api_client.get(url).content, (
+            'Ответ не зависит от выбранного сериализатора'
+        )
@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestStatelessAuth:
+    """Права проверяются по утверждениям токена без запроса пользователя"""
+
+    def get_token(self, client, user):
+        user.code = 'CODE'
+        user.save()
+        response = client.post(
+            '/api/v1/auth/token/',
+            {'username': user.username, 'confirmation_code': 'CODE'}
+        )
+        assert response.status_code == 200
+        return response.json()['token']
+
+    def user_queries(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_yamdbuser' in query['sql']
+        ]
+
+    def test_no_user_query(self, api_client, admin, catalog):
+        token = self.get_token(api_client, admin)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        api_client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.post(
+                f'/api/v1/titles/{catalog[0].id}/reviews/',
+                {'text': 'Отзыв', 'score': 5}
+            )
+            assert response.status_code == 201
+            assert response.json()['author'] == admin.username
+            response = api_client.delete(f'/api/v1/titles/{catalog[0].id}/')
+            assert response.status_code == 204
+        assert not [
+            sql for sql in self.user_queries(context)
+            if sql.startswith('SELECT')
+        ], 'Проверьте, что аутентификация не загружает пользователя из базы'
+
+    def test_me_and_role_change_revokes_token(self, api_client, admin):
+        token = self.get_token(api_client, admin)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = api_client.patch('/api/v1/users/me/', {'bio': 'о себе'})
+        assert response.status_code == 200
+        assert api_client.get('/api/v1/users/me/').json()['bio'] == 'о себе'
+        assert api_client.get('/api/v1/users/').status_code == 200
+        admin.refresh_from_db()
+        admin.role = 'user'
+        admin.save()
+        assert api_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что смена роли отзывает выданные токены'
+        )
+        api_client.credentials()
+        token = self.get_token(api_client, admin)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert api_client.get('/api/v1/users/').status_code == 403
+
+    def test_token_without_claims_rejected(self, api_client, admin):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+        )
+        assert api_client.get('/api/v1/users/me/').status_code == 401, (
+            'Токен без роли и версии нельзя отозвать, он не принимается'
+        )
@@ -0,0 +1,43 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleCardCache:
+    """Карточка произведения сбрасывается при изменении связанных данных"""
+
+    def get_card(self, client, title):
+        return client.get(f'/api/v1/titles/{title.id}/').json()
+
+    def test_genre_and_category_changes(self, api_client, catalog):
+        from reviews.models import Genre
+
+        title = catalog[0]
+        self.get_card(api_client, title)
+        title.category.name = 'Переименована'
+        title.category.save()
+        assert self.get_card(api_client, title)['category']['name'] == (
+            'Переименована'
+        )
+        genre = Genre.objects.create(name='Новый', slug='new')
+        title.genre.add(genre)
+        assert 'new' in [
+            g['slug'] for g in self.get_card(api_client, title)['genre']
+        ]
+        genre.titles.clear()
+        assert 'new' not in [
+            g['slug'] for g in self.get_card(api_client, title)['genre']
+        ]
+        title.category.delete()
+        assert self.get_card(api_client, title)['category'] is None
+
+    def test_review_changes_rating(self, admin_client, catalog):
+        title = catalog[0]
+        assert self.get_card(admin_client, title)['rating'] is None
+        admin_client.post(
+            f'/api/v1/titles/{title.id}/reviews/', {'text': 'ок', 'score': 7}
+        )
+        assert self.get_card(admin_client, title)['rating'] == 7
+        listed = admin_client.get('/api/v1/titles/').json()['results']
+        assert {'id': title.id, 'rating': 7} in [
+            {'id': card['id'], 'rating': card['rating']} for card in listed
+        ]
@@ -0,0 +1,102 @@
+import pytest
+
+FACETS_URL = '/api/v1/titles/facets/'
+
+
+def stored_facets():
+    from reviews.models import TitleFacet
+
+    return {
+        (facet.genre_key, facet.category_key, facet.year): facet.count
+        for facet in TitleFacet.objects.filter(count__gt=0)
+    }
+
+
+def rebuilt_facets():
+    from api.facets import rebuild_facets
+
+    rebuild_facets()
+    return stored_facets()
+
+
+@pytest.mark.django_db
+class TestTitleFacets:
+    """Счетчики фильтров совпадают с подсчетом по произведениям"""
+
+    FILTERS = (
+        {},
+        {'genre': 'genre-1'},
+        {'category': 'category-2'},
+        {'year': 2001},
+        {'genre': 'genre-0', 'category': 'category-0', 'year': 2000},
+        {'genre': 'missing'},
+    )
+
+    def live(self, params):
+        from api.facets import get_live_facets
+        from api.filters import TitleFilter
+        from reviews.models import Title
+
+        return get_live_facets(Title.objects.all(), TitleFilter, params)
+
+    def test_counts_match_live_query(self, api_client, catalog):
+        for params in self.FILTERS:
+            response = api_client.get(FACETS_URL, params)
+            assert response.status_code == 200, (
+                f'Счетчики фильтров {params} недоступны'
+            )
+            assert response.json() == self.live(params), (
+                f'Счетчики фильтров {params} расходятся с подсчетом '
+                'по произведениям'
+            )
+
+    def test_name_filter_uses_live_query(self, api_client, catalog):
+        params = {'name': 'Произведение 1', 'genre': 'genre-1'}
+        response = api_client.get(FACETS_URL, params)
+        assert response.json() == self.live(params), (
+            'С фильтром по названию счетчики считаются по произведениям'
+        )
+        assert response.json()['genre'], (
+            'Произведения с совпадающим названием должны быть посчитаны'
+        )
+
+    def test_stored_counts_follow_changes(self, catalog):
+        from reviews.models import Category, Genre
+
+        title = catalog[0]
+        title.year = 1999
+        title.category = Category.objects.get(slug='category-3')
+        title.save()
+        title.genre.remove(*title.genre.all()[:1])
+        title.genre.add(Genre.objects.get(slug='genre-5'))
+        Genre.objects.get(slug='genre-2').titles.clear()
+        Genre.objects.get(slug='genre-4').titles.add(*catalog[5:8])
+        Category.objects.get(slug='category-1').delete()
+        Genre.objects.get(slug='genre-3').delete()
+        catalog[7].delete()
+        assert stored_facets() == rebuilt_facets(), (
+            'Счетчики фильтров должны обновляться вместе с произведениями'
+        )
+
+    def test_bulk_writes_update_counts(self, admin_client, catalog):
+        response = admin_client.post('/api/v1/titles/bulk/', [
+            {'name': 'Новое', 'year': 1990, 'category': 'category-0',
+             'genre': ['genre-0', 'genre-1']},
+            {'name': 'Еще', 'year': 1991, 'category': 'category-1',
+             'genre': []},
+        ], format='json')
+        assert response.status_code == 201
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': catalog[0].id, 'year': 1995, 'genre': ['genre-5']},
+            {'id': catalog[1].id, 'category': 'category-3'},
+        ], format='json')
+        assert response.status_code == 200
+        assert stored_facets() == rebuilt_facets(), (
+            'Пакетная запись произведений должна обновлять счетчики фильтров'
+        )
+
+    def test_invalid_year(self, api_client, catalog):
+        response = api_client.get(FACETS_URL, {'year': 'abc'})
+        assert response.status_code == 400, (
+            'Нечисловой год должен возвращать статус 400'
+        )
@@ -0,0 +1,40 @@
+import pytest
+from django.conf import settings
+
+from .fixtures.fixture_data import TITLES_COUNT
+
+
+@pytest.mark.django_db
+class TestTitlePagination:
+    """Размер страницы от клиента и режимы подсчета"""
+
+    url = '/api/v1/titles/'
+
+    def test_page_size(self, api_client, catalog):
+        data = api_client.get(self.url, {'page_size': 10}).json()
+        assert len(data['results']) == 10
+        data = api_client.get(self.url, {'page_size': 10 ** 6}).json()
+        assert len(data['results']) == min(
+            TITLES_COUNT, settings.REVIEW['MAX_PAGE_SIZE']
+        )
+
+    def test_count_none(self, api_client, catalog,
+                        django_assert_num_queries):
+        api_client.get(self.url, {'page_size': TITLES_COUNT})
+        with django_assert_num_queries(1):
+            data = api_client.get(
+                self.url, {'count': 'none', 'page_size': 5}
+            ).json()
+        assert data['count'] is None
+        assert data['next'] is not None
+        last = api_client.get(
+            self.url, {'count': 'none', 'page_size': 5, 'page': 3}
+        ).json()
+        assert len(last['results']) == TITLES_COUNT - 10
+        assert last['next'] is None
+        response = api_client.get(self.url, {'count': 'none', 'page': 100})
+        assert response.status_code == 404
+
+    def test_count_estimate(self, api_client, catalog):
+        data = api_client.get(self.url, {'count': 'estimate'}).json()
+        assert data['count'] > 0
@@ -0,0 +1,40 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+    """Количество запросов не зависит от размера страницы и числа жанров"""
+
+    url = '/api/v1/titles/'
+
+    def test_title_list_queries(self, api_client, catalog,
+                                django_assert_num_queries):
+        with django_assert_num_queries(4):
+            response = api_client.get(self.url)
+        assert response.status_code == 200
+        assert all(item['genre'] for item in response.json()['results']), (
+            'Проверьте, что жанры произведений выводятся в списке'
+        )
+        with django_assert_num_queries(2):
+            cached = api_client.get(self.url)
+        assert cached.json() == response.json()
+
+    def test_title_list_filtered_queries(self, api_client, catalog,
+                                         django_assert_num_queries):
+        with django_assert_num_queries(4):
+            response = api_client.get(
+                self.url, {'genre': 'genre-1', 'year': 2001}
+            )
+        assert response.status_code == 200
+        assert response.json()['count'] > 0
+
+    def test_title_detail_queries(self, api_client, catalog,
+                                  django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = api_client.get(f'{self.url}{catalog[0].id}/')
+        assert response.status_code == 200
+        assert response.json()['category'] is not None
+        with django_assert_num_queries(0):
+            cached = api_client.get(f'{self.url}{catalog[0].id}/')
+        assert cached.json() == response.json()
+        assert api_client.get(f'{self.url}0/').status_code == 404
@@ -0,0 +1,112 @@
+import pytest
+
+TOP_URL = '/api/v1/titles/top/'
+
+
+@pytest.fixture
+def rated(catalog, django_user_model):
+    from api.services import rebuild_ratings
+    from reviews.models import Review
+
+    author = django_user_model.objects.create(
+        username='critic', email='critic@yamdb.fake'
+    )
+    for title, score in zip(catalog[:6], (3, 9, 5, 9, 1, 7)):
+        Review.objects.create(
+            title=title, author=author, text='Оценка', score=score
+        )
+    rebuild_ratings()
+    return catalog
+
+
+@pytest.mark.django_db
+class TestTitleRanking:
+    """Сортировка по индексированным полям и лучшие произведения"""
+
+    def test_ordering_whitelist(self, api_client, rated):
+        response = api_client.get(
+            '/api/v1/titles/', {'ordering': '-rating', 'page_size': 20}
+        )
+        ratings = [
+            card['rating'] for card in response.json()['results']
+            if card['rating'] is not None
+        ]
+        assert ratings == [9, 9, 7, 5, 3, 1], (
+            'Произведения должны сортироваться по рейтингу'
+        )
+        default = api_client.get('/api/v1/titles/').json()['results']
+        response = api_client.get(
+            '/api/v1/titles/', {'ordering': 'description'}
+        )
+        assert response.json()['results'] == default, (
+            'Сортировка по полю вне списка ordering_fields игнорируется'
+        )
+
+    def test_top_titles(self, api_client, rated):
+        response = api_client.get(TOP_URL, {'limit': 4})
+        assert response.status_code == 200
+        top = [(card['id'], card['rating']) for card in response.json()]
+        assert top == [
+            (rated[1].id, 9), (rated[3].id, 9),
+            (rated[5].id, 7), (rated[2].id, 5)
+        ], 'Лучшие произведения упорядочены по рейтингу и id'
+        response = api_client.get(TOP_URL, {'category': 'category-1'})
+        assert [card['id'] for card in response.json()] == [
+            rated[1].id, rated[5].id
+        ], 'Рейтинг в категории содержит только ее произведения'
+        response = api_client.get(TOP_URL, {'genre': 'genre-0'})
+        assert all(
+            'genre-0' in [genre['slug'] for genre in card['genre']]
+            for card in response.json()
+        ), 'Рейтинг в жанре содержит только его произведения'
+
+    def test_top_is_cached_and_invalidated(self, admin_client, rated,
+                                           django_assert_num_queries):
+        admin_client.get(TOP_URL)
+        with django_assert_num_queries(0):
+            admin_client.get(TOP_URL, {'limit': 3})
+        admin_client.post(
+            f'/api/v1/titles/{rated[10].id}/reviews/',
+            {'text': 'Шедевр', 'score': 10}
+        )
+        response = admin_client.get(TOP_URL)
+        assert response.json()[0]['id'] == rated[10].id, (
+            'Новый отзыв должен обновлять рейтинг лучших произведений'
+        )
+
+    def test_review_drops_only_affected_rankings(self, admin_client, rated,
+                                                 settings,
+                                                 django_assert_num_queries):
+        settings.REVIEW = {**settings.REVIEW, 'TOP_MAX_SIZE': 3}
+        other = rated[0].genre.exclude(
+            pk__in=rated[10].genre.all()
+        ).first()
+        urls = [
+            (TOP_URL, {'limit': 3}),
+            (TOP_URL, {'limit': 3, 'genre': other.slug}),
+        ]
+        for url, params in urls:
+            admin_client.get(url, params)
+        reviews_url = f'/api/v1/titles/{rated[10].id}/reviews/'
+        review = admin_client.post(
+            reviews_url, {'text': 'Слабо', 'score': 1}
+        ).json()
+        with django_assert_num_queries(0):
+            for url, params in urls:
+                admin_client.get(url, params)
+        admin_client.patch(
+            f'/api/v1/titles/{rated[6].id}/', {'description': 'Новое'}
+        )
+        with django_assert_num_queries(0):
+            admin_client.get(*urls[0])
+        admin_client.patch(f'{reviews_url}{review["id"]}/', {'score': 10})
+        assert admin_client.get(*urls[0]).json()[0]['id'] == rated[10].id, (
+            'Оценка, которая входит в список лучших, сбрасывает его'
+        )
+
+    @pytest.mark.parametrize('limit', ('0', '1000', 'abc'))
+    def test_invalid_limit(self, api_client, rated, limit):
+        response = api_client.get(TOP_URL, {'limit': limit})
+        assert response.status_code == 400, (
+            'Недопустимый limit должен возвращать статус 400'
+        )
@@ -0,0 +1,147 @@
+import pytest
+
+
+@pytest.fixture
+def library(db):
+    from reviews.models import Title
+
+    return {
+        name: Title.objects.create(name=name, year=2000)
+        for name in ('Война и мир', 'Мир', 'Миры', 'Сказка о мире', 'Дом')
+    }
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+    """Поиск по названию через индекс и ранжирование результатов"""
+
+    def search(self, client, query, **params):
+        response = client.get('/api/v1/titles/', {'name': query, **params})
+        assert response.status_code == 200
+        return [card['name'] for card in response.json()['results']]
+
+    def test_ranked_results(self, api_client, library):
+        assert self.search(api_client, 'Мир', page_size=10) == [
+            'Мир', 'Миры', 'Война и мир', 'Сказка о мире'
+        ], 'Сначала названия с запроса, затем более короткие'
+        assert self.search(
+            api_client, 'мир', ordering='-name', page_size=10
+        ) == ['Сказка о мире', 'Миры', 'Мир', 'Война и мир'], (
+            'Явный порядок заменяет ранжирование'
+        )
+        assert self.search(api_client, 'ми', page_size=10)[:2] == [
+            'Мир', 'Миры'
+        ], 'Короткие запросы проверяются без триграмм'
+        assert self.search(api_client, 'рыба') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_follows_writes(self, api_client, library):
+        from api.search import title_index
+        from reviews.models import Title
+
+        assert self.search(api_client, 'дом') == ['Дом']
+        version = title_index.version
+        title = Title.objects.create(name='Дом у дороги', year=2001)
+        library['Дом'].delete()
+        assert self.search(api_client, 'дом') == ['Дом у дороги']
+        title.name = 'Домик'
+        title.save()
+        assert self.search(api_client, 'дом') == ['Домик']
+        assert title_index.version != version
+        assert self.search(api_client, 'дорог') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rolled_back_writes_are_not_indexed(self, api_client, library):
+        from django.db import transaction
+        from reviews.models import Title
+
+        assert self.search(api_client, 'сказ') == ['Сказка о мире']
+        with transaction.atomic():
+            Title.objects.create(name='Сказки', year=2002)
+            transaction.set_rollback(True)
+        assert self.search(api_client, 'сказ') == ['Сказка о мире'], (
+            'Изменения публикуются только после фиксации транзакции'
+        )
+
+    def test_other_processes_replay_changes(self, library, monkeypatch):
+        from api.search import TitleNameIndex
+
+        writer, reader = TitleNameIndex(), TitleNameIndex()
+        for index in (writer, reader):
+            index.sync()
+
+        def load():
+            raise AssertionError('Индекс догоняет версию без перестроения')
+
+        monkeypatch.setattr(reader, 'load', load)
+        writer.publish([(library['Дом'].pk, 'Домик')])
+        reader.publish([(library['Мир'].pk, None)])
+        assert reader.version == writer.version - 1, (
+            'Версия, перед которой есть чужие изменения, не присваивается'
+        )
+        writer.publish([(100, 'Домище')])
+        assert reader.search('дом', 10) == [library['Дом'].pk, 100]
+        assert reader.search('мир', 10) == writer.search('мир', 10)
+        assert reader.version == writer.version
+
+    def test_lost_changes_rebuild_index(self, library):
+        from api.cache import TITLE_SEARCH, invalidate
+        from api.search import TitleNameIndex
+        from reviews.models import Title
+
+        index = TitleNameIndex()
+        index.sync()
+        Title.objects.filter(pk=library['Дом'].pk).update(name='Домик')
+        invalidate(TITLE_SEARCH)
+        assert index.search('домик', 10) == [library['Дом'].pk], (
+            'Смена версии без журнала перестраивает индекс'
+        )
+
+    def test_changes_from_other_processes(self, api_client, library):
+        from api.cache import TITLE_SEARCH, bump_version
+        from reviews.models import Title
+
+        assert self.search(api_client, 'сказ') == ['Сказка о мире']
+        Title.objects.bulk_create([Title(name='Сказки', year=2002)])
+        assert self.search(api_client, 'сказ') == ['Сказка о мире'], (
+            'Без сигналов индекс не знает о новых названиях'
+        )
+        bump_version(TITLE_SEARCH)
+        assert self.search(api_client, 'сказ') == [
+            'Сказки', 'Сказка о мире'
+        ], 'Смена версии в кэше перестраивает индекс'
+
+    def test_truncated_matches_are_reported(self, api_client, library,
+                                            settings):
+        from django.db import connection
+
+        if connection.vendor == 'postgresql':
+            pytest.skip('На PostgreSQL совпадения не усекаются')
+        settings.REVIEW = {**settings.REVIEW, 'SEARCH_MAX_RESULTS': 2}
+        response = api_client.get('/api/v1/titles/', {'name': 'мир'})
+        assert response['X-Search-Truncated'] == '2', (
+            'Усечение совпадений сообщается заголовком'
+        )
+        assert [card['name'] for card in response.json()['results']] == [
+            'Мир', 'Миры'
+        ], 'Остаются лучшие совпадения'
+        response = api_client.get(
+            '/api/v1/titles/facets/', {'name': 'мир'}
+        )
+        assert response['X-Search-Truncated'] == '2'
+        response = api_client.get('/api/v1/titles/', {'name': 'дом'})
+        assert 'X-Search-Truncated' not in response
+
+    def test_search_with_filters_and_facets(self, api_client, catalog):
+        names = self.search(
+            api_client, 'произведение 1', category='category-2',
+            page_size=20
+        )
+        assert names == ['Произведение 10']
+        response = api_client.get(
+            '/api/v1/titles/facets/', {'name': 'произведение 1'}
+        )
+        assert response.status_code == 200
+        assert sum(
+            item['count'] for item in response.json()['category']
+        ) == 3
@@ -0,0 +1,51 @@
+import pytest
+
+
+def query_plan(queryset):
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+
+@pytest.mark.django_db
+class TestUserSearch:
+    """Поиск пользователей по началу имени и адреса"""
+
+    def test_prefix_search(self, admin_client, django_user_model):
+        for username, email in (
+            ('alice', 'alice@yamdb.fake'),
+            ('Bob', 'robert@yamdb.fake'),
+            ('malice', 'mal@yamdb.fake'),
+        ):
+            django_user_model.objects.create(username=username, email=email)
+
+        def search(query):
+            response = admin_client.get('/api/v1/users/', {'search': query})
+            assert response.status_code == 200
+            return sorted(
+                user['username'] for user in response.json()['results']
+            )
+
+        assert search('ALI') == ['alice'], (
+            'Поиск идет по началу имени без учета регистра'
+        )
+        assert search('rob') == ['Bob'], 'Поиск идет и по адресу почты'
+        assert search('bo') == ['Bob']
+
+    def test_sqlite_plans_use_indexes(self):
+        from django.db import connection
+        from django.db.models import Q
+        from reviews.models import User
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('План проверяется на SQLite')
+        plan = query_plan(User.objects.filter(
+            Q(username__istartswith='ab') | Q(email__istartswith='ab')
+        ))
+        assert 'user_username_prefix_idx' in plan
+        assert 'user_email_prefix_idx' in plan
+        plan = query_plan(User.objects.order_by('-date_joined')[:10])
+        assert 'user_date_joined_idx' in plan